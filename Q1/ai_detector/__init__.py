@@ -1,4 +1,23 @@
 """AI vs Human detector utilities."""
 
-__all__ = ["data", "model", "predictor"]
-
+__all__ = [
+    "bench",
+    "bulk",
+    "cache",
+    "compact",
+    "data",
+    "download",
+    "evaluation",
+    "features",
+    "fingerprint",
+    "instrumentation",
+    "longdoc",
+    "model",
+    "neardup",
+    "predictor",
+    "registry",
+    "serve",
+    "shards",
+    "text",
+    "tuning",
+]
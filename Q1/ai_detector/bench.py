@@ -0,0 +1,273 @@
+"""Benchmark harness for dataset build, training, evaluation, cold start and inference."""
+from __future__ import annotations
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import data, evaluation
+from .model import build_pipeline
+from .paths import BASE_DIR, RAW_DATA_PATH
+
+# Metrics where a larger value is better; every other metric is a duration or
+# a size where smaller is better.
+HIGHER_IS_BETTER = ("docs_per_second",)
+
+# The scoring path (``import ai_detector.predictor``) must not load these;
+# they are training dependencies and cost seconds of startup.
+SCORING_MODULE = "ai_detector.predictor"
+SCORING_FORBIDDEN_IMPORTS = ("sklearn", "pandas", "scipy", "joblib", "requests")
+SCORING_IMPORT_BUDGET_MS = 300.0
+
+_COLD_START_SNIPPETS = {
+    "cold_start_scorer_s": (
+        "from ai_detector.predictor import current_model; current_model()"
+    ),
+    "cold_start_joblib_s": (
+        "from ai_detector.model import load_trained_model; load_trained_model()"
+    ),
+}
+
+
+def _timed(func: Callable[[], object], repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def replicate_texts(texts: Sequence[str], size: int) -> List[str]:
+    """Cycle ``texts`` up to ``size`` items, tagging copies so they stay distinct."""
+    out: List[str] = []
+    for index in range(size):
+        base = texts[index % len(texts)]
+        copy = index // len(texts)
+        out.append(base if copy == 0 else f"{base} copy{copy}")
+    return out
+
+
+def _write_replicated_raw(path: Path, factor: int) -> None:
+    with RAW_DATA_PATH.open("r", encoding="utf-8") as source:
+        records = [json.loads(line) for line in source if line.strip()]
+    with path.open("w", encoding="utf-8") as handle:
+        for copy in range(factor):
+            for record in records:
+                if copy:
+                    record = {
+                        key: [f"{text} copy{copy}" for text in record.get(key, [])]
+                        for key in ("human_answers", "chatgpt_answers")
+                    }
+                handle.write(json.dumps(record) + "\n")
+
+
+def bench_dataset_build(factor: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.jsonl"
+        _write_replicated_raw(raw_path, factor)
+        seconds = _timed(
+            lambda: data.write_dataset(raw_path, Path(tmp) / "out.csv", limit_per_label=None)
+        )
+    return {f"dataset_build_x{factor}_s": seconds}
+
+
+def bench_training(texts: Sequence[str], labels: Sequence[str]) -> Dict[str, float]:
+    pipeline = build_pipeline()
+    vectorizer = pipeline.named_steps["tfidf"]
+    classifier = pipeline.named_steps["clf"]
+    started = time.perf_counter()
+    features = vectorizer.fit_transform(texts)
+    vectorize_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    classifier.fit(features, labels)
+    fit_seconds = time.perf_counter() - started
+    return {
+        f"vectorize_{len(texts)}_s": vectorize_seconds,
+        f"lr_fit_{len(texts)}_s": fit_seconds,
+    }
+
+
+def bench_evaluation(
+    n_rows: int = 100_000, n_resamples: int = 1000, seed: int = 0
+) -> Dict[str, float]:
+    """Time the threshold sweep and the bootstrap on a synthetic holdout."""
+    rng = np.random.default_rng(seed)
+    y_true = rng.random(n_rows) < 0.5
+    # Rounded so there are ties, as with real probabilities of duplicate texts.
+    scores = np.round(np.clip(rng.normal(0.35 + 0.3 * y_true, 0.2), 0.0, 1.0), 4)
+    sweep_seconds = _timed(lambda: evaluation.evaluate(y_true, scores, "f1", n_resamples=0))
+    bootstrap_seconds = _timed(
+        lambda: evaluation.bootstrap(y_true, scores, n_resamples=n_resamples)
+    )
+    return {
+        f"eval_sweep_{n_rows}_s": sweep_seconds,
+        f"eval_bootstrap_{n_rows}x{n_resamples}_s": bootstrap_seconds,
+    }
+
+
+def bench_cold_start(repeat: int = 3) -> Dict[str, float]:
+    """Time a fresh interpreter importing the package and loading the model."""
+    results = {}
+    for name, snippet in _COLD_START_SNIPPETS.items():
+        program = (
+            "import time, warnings; warnings.simplefilter('ignore'); "
+            f"t = time.perf_counter(); {snippet}; print(time.perf_counter() - t)"
+        )
+        timings = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", program],
+                cwd=BASE_DIR,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            timings.append(float(output.strip().splitlines()[-1]))
+        results[name] = min(timings)
+    return results
+
+
+def import_times(module: str = SCORING_MODULE) -> Dict[str, float]:
+    """Cumulative import time (ms) of every module loaded by ``import module``.
+
+    Parsed from ``python -X importtime`` in a fresh interpreter.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000.0
+    return times
+
+
+def check_import_budget(
+    module: str = SCORING_MODULE,
+    budget_ms: float = SCORING_IMPORT_BUDGET_MS,
+    forbidden: Sequence[str] = SCORING_FORBIDDEN_IMPORTS,
+    repeat: int = 3,
+) -> Dict[str, object]:
+    """Import ``module`` in fresh interpreters and report budget violations.
+
+    The time is the best of ``repeat`` runs. Any forbidden package (or one of
+    its submodules) in the import graph is a violation regardless of time.
+    """
+    runs = [import_times(module) for _ in range(repeat)]
+    import_ms = min(run.get(module, float("inf")) for run in runs)
+    loaded = sorted(
+        {
+            package
+            for name in runs[0]
+            for package in forbidden
+            if name == package or name.startswith(package + ".")
+        }
+    )
+    violations = [f"{module} imports {package}" for package in loaded]
+    if import_ms > budget_ms:
+        violations.append(f"{module} took {import_ms:.1f} ms to import (budget {budget_ms} ms)")
+    return {
+        "module": module,
+        "import_ms": round(import_ms, 3),
+        "budget_ms": budget_ms,
+        "violations": violations,
+    }
+
+
+def bench_single_latency(texts: Sequence[str], n: int = 300) -> Dict[str, float]:
+    from .predictor import predict_text
+
+    predict_text(texts[0])
+    latencies = []
+    for text in replicate_texts(texts, n):
+        started = time.perf_counter()
+        predict_text(text)
+        latencies.append(time.perf_counter() - started)
+    millis = np.array(latencies) * 1000.0
+    return {
+        "single_p50_ms": float(np.percentile(millis, 50)),
+        "single_p99_ms": float(np.percentile(millis, 99)),
+    }
+
+
+def bench_batch_throughput(texts: Sequence[str], sizes: Sequence[int]) -> Dict[str, float]:
+    from .predictor import predict_batch
+
+    results = {}
+    for size in sizes:
+        batch = replicate_texts(texts, size)
+        seconds = _timed(lambda: predict_batch(batch), repeat=2)
+        results[f"batch_{size}_docs_per_second"] = size / seconds
+    return results
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def run_benchmarks(
+    dataset: pd.DataFrame,
+    build_factor: int = 4,
+    train_size: int = 10_000,
+    batch_sizes: Sequence[int] = (100, 1_000, 10_000),
+    latency_samples: int = 300,
+    eval_rows: int = 100_000,
+) -> Dict[str, float]:
+    texts = dataset["text"].astype(str).tolist()
+    labels = dataset["label"].astype(str).tolist()
+    train_texts = replicate_texts(texts, train_size)
+    train_labels = [labels[i % len(labels)] for i in range(train_size)]
+
+    results: Dict[str, float] = {}
+    results.update(bench_dataset_build(build_factor))
+    results.update(bench_training(train_texts, train_labels))
+    results.update(bench_evaluation(eval_rows))
+    results.update(bench_cold_start())
+    results["import_predictor_ms"] = check_import_budget()["import_ms"]
+    results.update(bench_single_latency(texts, latency_samples))
+    results.update(bench_batch_throughput(texts, batch_sizes))
+    results["peak_rss_mb"] = peak_rss_mb()
+    return {name: round(value, 6) for name, value in results.items()}
+
+
+def compare_to_baseline(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float = 0.2
+) -> List[Dict[str, object]]:
+    """Return one entry per metric that is worse than baseline by more than ``tolerance``."""
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (reference - value) / reference
+        else:
+            change = (value - reference) / reference
+        if change > tolerance:
+            regressions.append(
+                {
+                    "metric": name,
+                    "baseline": reference,
+                    "current": value,
+                    "worse_by": round(change, 4),
+                }
+            )
+    return regressions
@@ -0,0 +1,170 @@
+"""Streaming bulk scoring over JSONL/CSV record streams."""
+from __future__ import annotations
+
+import csv
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .instrumentation import STATS
+from .predictor import DEFAULT_BATCH_SIZE, current_model, score_chunks
+from .text import _clean_text
+
+FORMATS = ("jsonl", "csv")
+SCORE_FIELDS = ("prediction", "ai_probability", "human_probability")
+
+
+def infer_format(path: str | None, default: str = "jsonl") -> str:
+    """Guess ``jsonl`` or ``csv`` from a file extension."""
+    if not path or path == "-":
+        return default
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in {".jsonl", ".ndjson", ".json"}:
+        return "jsonl"
+    return default
+
+
+def iter_records(handle: IO[str], fmt: str) -> Iterator[Dict[str, object]]:
+    """Yield one dict per input line without reading the whole stream.
+
+    A JSONL line that is not valid JSON or not an object raises
+    ``ValueError`` naming its line number.
+    """
+    if fmt == "jsonl":
+        for number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"Line {number} is not valid JSON: {exc}") from exc
+            if not isinstance(record, dict):
+                raise ValueError(
+                    f"Line {number} is a JSON {type(record).__name__}; expected an object."
+                )
+            yield record
+    elif fmt == "csv":
+        csv.field_size_limit(sys.maxsize)
+        yield from csv.DictReader(handle)
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}.")
+
+
+class RecordWriter:
+    """Write scored records as JSONL or CSV, one row at a time.
+
+    CSV columns are ``fieldnames`` when given, else the input fields of the
+    first record, followed by ``SCORE_FIELDS``. Fields missing from a record
+    are left empty; a record with a field outside the header raises
+    ``ValueError`` rather than losing that column.
+    """
+
+    def __init__(
+        self, handle: IO[str], fmt: str, fieldnames: Optional[List[str]] = None
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}.")
+        self.handle = handle
+        self.fmt = fmt
+        self.fieldnames = fieldnames
+        self._csv_writer: Optional[csv.DictWriter] = None
+
+    def write(self, record: Dict[str, object]) -> None:
+        if self.fmt == "jsonl":
+            self.handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if self._csv_writer is None:
+            inputs = self.fieldnames or [key for key in record if key not in SCORE_FIELDS]
+            columns = list(dict.fromkeys([*inputs, *SCORE_FIELDS]))
+            self._csv_writer = csv.DictWriter(self.handle, fieldnames=columns)
+            self._csv_writer.writeheader()
+        extra = [key for key in record if key not in self._csv_writer.fieldnames]
+        if extra:
+            raise ValueError(
+                f"Record has fields {extra} that are not in the CSV header "
+                f"{self._csv_writer.fieldnames}; pass them in fieldnames "
+                "(predict.py --output-fields) or write JSONL."
+            )
+        self._csv_writer.writerow(record)
+
+
+@dataclass
+class BulkStats:
+    documents: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "documents": self.documents,
+            "skipped": self.skipped,
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(self.documents / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def _chunked(records: Iterable[Dict[str, object]], size: int) -> Iterator[List[Dict[str, object]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_records(
+    records: Iterable[Dict[str, object]],
+    text_field: str = "text",
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+    stats: BulkStats | None = None,
+    n_jobs: int = 1,
+) -> Iterator[Dict[str, object]]:
+    """Score ``records`` lazily, holding a bounded number of chunks in memory.
+
+    Each output row is the input record extended with ``SCORE_FIELDS``:
+    ``prediction``, ``ai_probability`` and ``human_probability`` (the same column names as
+    ``sample_predictions.csv``, so an input ``label`` column survives).
+    Records whose text field is missing or blank are skipped and counted in
+    ``stats``. ``n_jobs > 1`` scores chunks in a process pool while keeping
+    the input order. The model, and so its operating threshold, is resolved
+    once per call.
+    """
+    stats = stats if stats is not None else BulkStats()
+    pending: Deque[List[Dict[str, object]]] = deque()
+
+    def text_chunks() -> Iterator[List[str]]:
+        for chunk in _chunked(records, chunk_size):
+            started = time.perf_counter() if STATS.enabled else 0.0
+            kept, texts = [], []
+            for record in chunk:
+                clean = _clean_text(str(record.get(text_field) or ""))
+                if clean:
+                    kept.append(record)
+                    texts.append(clean)
+            if STATS.enabled:
+                STATS.observe("clean", time.perf_counter() - started)
+            stats.skipped += len(chunk) - len(kept)
+            if kept:
+                pending.append(kept)
+                yield texts
+
+    model = current_model()
+    for ai_probability in score_chunks(text_chunks(), n_jobs=n_jobs, model=model):
+        kept = pending.popleft()
+        for record, ai_prob in zip(kept, ai_probability):
+            yield {
+                **record,
+                "prediction": "ai" if ai_prob >= model.threshold else "human",
+                "ai_probability": float(ai_prob),
+                "human_probability": float(1.0 - ai_prob),
+            }
+        stats.documents += len(kept)
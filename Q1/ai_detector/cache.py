@@ -0,0 +1,153 @@
+"""Content-addressed cache of AI probabilities for repeated texts.
+
+Keys hash the cleaned text together with the model artifact fingerprint, so
+retraining ``MODEL_PATH`` makes every old entry unreachable. Lookups go to a
+bounded in-memory LRU first and then, if configured, to a SQLite file that
+is shared across processes and CLI invocations. Processes serving different
+model versions can share that file; it is bounded by row count, dropping
+the oldest writes first.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .paths import ensure_directories
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_DISK_ENTRIES = 1_000_000
+_SQLITE_BATCH = 500
+
+
+def cache_key(clean_text: str, fingerprint: str) -> str:
+    payload = f"{fingerprint}\0{clean_text}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        sqlite_path: Path | None = None,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ) -> None:
+        if max_entries < 1 or max_disk_entries < 1:
+            raise ValueError("max_entries and max_disk_entries must be positive integers.")
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint: str | None = None
+        self._db: sqlite3.Connection | None = None
+        if self.sqlite_path is not None:
+            ensure_directories(extra={self.sqlite_path.parent})
+            self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, ai_probability REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def use_model(self, fingerprint: str) -> None:
+        """Switch to ``fingerprint``; the in-memory entries of the old model are dropped.
+
+        Rows of other models stay in SQLite, since another process may still
+        serve them; keys never collide across models.
+        """
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return
+            self._fingerprint = fingerprint
+            self._lru.clear()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        """Return the cached value of every key that is present in either tier."""
+        found: Dict[str, float] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value = self._lru.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._lru.move_to_end(key)
+                    found[key] = value
+            memory_hits = len(found)
+            if missing and self._db is not None:
+                for start in range(0, len(missing), _SQLITE_BATCH):
+                    batch = missing[start : start + _SQLITE_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._db.execute(
+                        "SELECT key, ai_probability FROM predictions "
+                        f"WHERE key IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                    for key, value in rows:
+                        found[key] = value
+                        self._remember(key, value)
+            self.hits += len(found)
+            self.disk_hits += len(found) - memory_hits
+            self.misses += len(missing) - (len(found) - memory_hits)
+        return found
+
+    def put_many(self, values: Dict[str, float]) -> None:
+        if not values:
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._remember(key, value)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, model, ai_probability) "
+                    "VALUES (?, ?, ?)",
+                    [(key, self._fingerprint or "", value) for key, value in values.items()],
+                )
+                # Replaced and new rows get increasing rowids, so this keeps
+                # at most max_disk_entries of the most recent writes.
+                self._db.execute(
+                    "DELETE FROM predictions "
+                    "WHERE rowid <= (SELECT MAX(rowid) FROM predictions) - ?",
+                    (self.max_disk_entries,),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: float) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "sqlite_path": str(self.sqlite_path) if self.sqlite_path else None,
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
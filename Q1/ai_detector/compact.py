@@ -0,0 +1,182 @@
+"""Compact, memory-mappable scoring artifact for the TF-IDF + LR detector.
+
+``export_compact`` flattens a fitted pipeline into a directory of ``.npy``
+arrays (sorted n-gram terms, idf and coefficients in the same order) plus a
+small ``meta.json``. ``CompactScorer`` maps those arrays read-only and
+re-implements the word analyzer, TF-IDF weighting and logistic link with
+NumPy only, so loading it imports neither scikit-learn nor pickle.
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+from .fingerprint import file_sha256
+from .paths import COMPACT_MODEL_DIR, MODEL_PATH, ensure_directories
+
+FORMAT_VERSION = 1
+
+
+class CompactFeatures(NamedTuple):
+    """Sparse TF-IDF rows as parallel (document, column, weight) arrays."""
+
+    n_docs: int
+    docs: np.ndarray
+    cols: np.ndarray
+    weights: np.ndarray
+
+
+def export_compact(
+    pipeline, path: Path = COMPACT_MODEL_DIR, source: Path = MODEL_PATH
+) -> str:
+    """Write the compact scoring artifact for a fitted TF-IDF + LR pipeline.
+
+    ``source`` is the joblib artifact the pipeline was saved to; its hash is
+    recorded so stale exports can be detected.
+    """
+    vectorizer = pipeline.named_steps["tfidf"]
+    classifier = pipeline.named_steps["clf"]
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer or vectorizer.preprocessor:
+        raise ValueError("Compact export only supports the default word analyzer.")
+    if vectorizer.strip_accents or vectorizer.binary:
+        raise ValueError("Compact export does not support strip_accents or binary TF.")
+    if len(classifier.classes_) != 2:
+        raise ValueError("Compact export only supports binary classifiers.")
+
+    terms = sorted(vectorizer.vocabulary_)
+    columns = np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int64)
+    idf = vectorizer.idf_[columns] if vectorizer.use_idf else np.ones(len(terms))
+    stop_words = vectorizer.get_stop_words() or frozenset()
+
+    path = Path(path)
+    ensure_directories(extra={path})
+    np.save(path / "terms.npy", np.array(terms, dtype=str))
+    np.save(path / "idf.npy", np.asarray(idf, dtype=np.float64))
+    np.save(path / "coef.npy", np.asarray(classifier.coef_[0][columns], dtype=np.float64))
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "source_sha256": file_sha256(source) if Path(source).exists() else None,
+        "classes": [str(label) for label in classifier.classes_],
+        "intercept": float(classifier.intercept_[0]),
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words),
+        "norm": vectorizer.norm,
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+    }
+    (path / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return str(path)
+
+
+class CompactScorer:
+    """NumPy-only scorer with the ``classes_`` / ``predict_proba`` surface of the pipeline."""
+
+    def __init__(self, path: Path = COMPACT_MODEL_DIR) -> None:
+        path = Path(path)
+        meta: Dict[str, object] = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact artifact version at {path}.")
+        self.meta = meta
+        self.terms = np.load(path / "terms.npy", mmap_mode="r")
+        self.idf = np.load(path / "idf.npy", mmap_mode="r")
+        self.coef = np.load(path / "coef.npy", mmap_mode="r")
+        self.classes_ = np.array(meta["classes"])
+        self.intercept = float(meta["intercept"])
+        self._token_re = re.compile(str(meta["token_pattern"]))
+        self._stop_words = frozenset(meta["stop_words"])
+        self._min_n, self._max_n = meta["ngram_range"]
+
+    def _ngrams(self, text: str) -> List[str]:
+        if self.meta["lowercase"]:
+            text = text.lower()
+        tokens = [
+            token for token in self._token_re.findall(text) if token not in self._stop_words
+        ]
+        grams: List[str] = []
+        for n in range(self._min_n, self._max_n + 1):
+            if n == 1:
+                grams.extend(tokens)
+            else:
+                grams.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, texts: Sequence[str]) -> CompactFeatures:
+        """Return the L2-normalized TF-IDF entries of ``texts`` in COO form."""
+        n_docs = len(texts)
+        # The candidate array is fixed-width, so one long token (a URL, a base64
+        # blob) would size every row; grams longer than any term cannot match.
+        max_len = self.terms.dtype.itemsize // 4
+        grams: List[str] = []
+        doc_ids: List[int] = []
+        for doc, text in enumerate(texts):
+            doc_grams = [gram for gram in self._ngrams(text) if len(gram) <= max_len]
+            grams.extend(doc_grams)
+            doc_ids.extend([doc] * len(doc_grams))
+        if not grams:
+            empty = np.empty(0, dtype=np.int64)
+            return CompactFeatures(n_docs, empty, empty, np.empty(0, dtype=np.float64))
+
+        vocab_size = len(self.terms)
+        candidates = np.array(grams, dtype=str)
+        position = np.searchsorted(self.terms, candidates)
+        position[position == vocab_size] = 0
+        hit = self.terms[position] == candidates
+        keys = np.asarray(doc_ids, dtype=np.int64)[hit] * vocab_size + position[hit]
+        keys, counts = np.unique(keys, return_counts=True)
+        docs, cols = np.divmod(keys, vocab_size)
+
+        tf = counts.astype(np.float64)
+        if self.meta["sublinear_tf"]:
+            tf = np.log(tf) + 1.0
+        weights = tf * self.idf[cols]
+        if self.meta["norm"] == "l2":
+            norms = np.sqrt(np.bincount(docs, weights=weights**2, minlength=n_docs))
+        elif self.meta["norm"] == "l1":
+            norms = np.bincount(docs, weights=np.abs(weights), minlength=n_docs)
+        else:
+            norms = np.ones(n_docs)
+        norms[norms == 0.0] = 1.0
+        weights /= norms[docs]
+        return CompactFeatures(n_docs, docs, cols, weights)
+
+    def decision_from_features(self, features: CompactFeatures) -> np.ndarray:
+        scores = np.full(features.n_docs, self.intercept, dtype=np.float64)
+        if len(features.docs):
+            scores += np.bincount(
+                features.docs,
+                weights=features.weights * self.coef[features.cols],
+                minlength=features.n_docs,
+            )
+        return scores
+
+    def predict_proba_features(self, features: CompactFeatures) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-self.decision_from_features(features)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        return self.decision_from_features(self.transform(texts))
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.predict_proba_features(self.transform(texts))
+
+
+def load_compact_model(
+    path: Path = COMPACT_MODEL_DIR, source: Path | None = MODEL_PATH
+) -> CompactScorer:
+    """Load the compact scorer, checking it was exported from ``source``."""
+    path = Path(path)
+    if not (path / "meta.json").exists():
+        raise FileNotFoundError(
+            f"Compact artifact not found at {path}. Run aiot_hw5/Q1/train.py first."
+        )
+    scorer = CompactScorer(path)
+    if source is not None and Path(source).exists():
+        if scorer.meta.get("source_sha256") != file_sha256(source):
+            raise ValueError(f"Compact artifact at {path} is stale relative to {source}.")
+    return scorer
+
@@ -1,92 +1,306 @@
 """Data handling helpers for the AI vs Human detector."""
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
+import os
 import random
+import sys
+import tempfile
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 import pandas as pd
-import requests
 
+from . import neardup
+from .download import download_file
+from .fingerprint import file_sha256
 from .paths import (
     HC3_OPEN_QA_URL,
+    LABELED_ADDITIONS_PATH,
+    PROCESSED_CACHE_META_PATH,
+    PROCESSED_CACHE_PATH,
     PROCESSED_DATASET_PATH,
     RAW_DATA_PATH,
     ensure_directories,
 )
+from .text import _clean_text
 
 
 def download_raw_dataset(force: bool = False, url: str = HC3_OPEN_QA_URL) -> Path:
-    """Download the HC3 open QA split to the raw data directory."""
+    """Download the HC3 open QA split to the raw data directory.
+
+    The transfer is streamed, resumable and checksum-verified; see
+    ``ai_detector.download``.
+    """
     ensure_directories()
     if RAW_DATA_PATH.exists() and not force:
         return RAW_DATA_PATH
+    return download_file(url, RAW_DATA_PATH)
+
+
+def iter_raw_records(path: Path) -> Iterator[dict]:
+    """Yield one HC3 record per non-empty JSONL line."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
 
-    response = requests.get(url, timeout=60)
-    response.raise_for_status()
-    RAW_DATA_PATH.write_bytes(response.content)
-    return RAW_DATA_PATH
 
+def _iter_answers(records: Iterable[dict]) -> Iterator[Tuple[str, str]]:
+    for record in records:
+        for label, key in (("human", "human_answers"), ("ai", "chatgpt_answers")):
+            for text in record.get(key, []):
+                clean = _clean_text(text)
+                if clean:
+                    yield clean, label
 
-def _clean_text(text: str) -> str:
-    text = (text or "").strip()
-    return " ".join(text.split())
 
+def _dedup(rows: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+    # Keep a 16-byte digest per distinct row instead of the text itself.
+    seen = set()
+    for text, label in rows:
+        key = hashlib.blake2b(f"{label}\0{text}".encode("utf-8"), digest_size=16).digest()
+        if key in seen:
+            continue
+        seen.add(key)
+        yield text, label
 
-def _flatten_answers(records: Iterable[dict], limit_per_label: int | None) -> pd.DataFrame:
-    rows: List[dict] = []
 
-    def append_rows(samples: Iterable[str], label: str) -> None:
-        for text in samples:
-            clean = _clean_text(text)
-            if not clean:
-                continue
-            rows.append({"text": clean, "label": label})
+def _reservoir_sample(
+    rows: Iterable[Tuple[str, str]], limit_per_label: int, rng: random.Random
+) -> List[Tuple[str, str]]:
+    """Uniformly keep at most ``limit_per_label`` rows per label in one pass."""
+    reservoirs: Dict[str, List[Tuple[str, str]]] = {}
+    seen: Dict[str, int] = {}
+    for row in rows:
+        label = row[1]
+        reservoir = reservoirs.setdefault(label, [])
+        count = seen.get(label, 0)
+        if count < limit_per_label:
+            reservoir.append(row)
+        else:
+            slot = rng.randint(0, count)
+            if slot < limit_per_label:
+                reservoir[slot] = row
+        seen[label] = count + 1
+    return [row for label in sorted(reservoirs) for row in reservoirs[label]]
+
+
+def _write_rows(path: Path, rows: Iterable[Tuple[str, str]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["text", "label"])
+        writer.writerows(rows)
 
-    for record in records:
-        append_rows(record.get("human_answers", []), "human")
-        append_rows(record.get("chatgpt_answers", []), "ai")
 
-    df = pd.DataFrame(rows).drop_duplicates()
+def _external_shuffle(
+    rows: Iterable[Tuple[str, str]], path: Path, rng: random.Random, buckets: int = 64
+) -> None:
+    """Shuffle an unbounded row stream into ``path`` via random on-disk buckets."""
+    csv.field_size_limit(sys.maxsize)
+    with tempfile.TemporaryDirectory(dir=path.parent) as tmp:
+        bucket_paths = [Path(tmp) / f"bucket_{index:03d}.csv" for index in range(buckets)]
+        handles = [bucket.open("w", encoding="utf-8", newline="") for bucket in bucket_paths]
+        try:
+            writers = [csv.writer(handle) for handle in handles]
+            for row in rows:
+                writers[rng.randrange(buckets)].writerow(row)
+        finally:
+            for handle in handles:
+                handle.close()
+
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["text", "label"])
+            for bucket in bucket_paths:
+                with bucket.open("r", encoding="utf-8", newline="") as bucket_handle:
+                    bucket_rows = list(csv.reader(bucket_handle))
+                rng.shuffle(bucket_rows)
+                writer.writerows(bucket_rows)
+
+
+def _near_dedup(raw_path: Path, threshold: float) -> Iterator[Tuple[str, str]]:
+    # First pass: MinHash every distinct row and keep the first of each
+    # near-duplicate group. Second pass: stream the rows again, filtered.
+    texts = (text for text, _ in _dedup(_iter_answers(iter_raw_records(raw_path))))
+    keep = neardup.first_of_groups(neardup.group_texts(texts, threshold=threshold))
+    rows = _dedup(_iter_answers(iter_raw_records(raw_path)))
+    return (row for row, kept in zip(rows, keep) if kept)
+
+
+def write_dataset(
+    raw_path: Path,
+    output_path: Path = PROCESSED_DATASET_PATH,
+    limit_per_label: int | None = 4000,
+    seed: int = 42,
+    near_dup_threshold: float | None = neardup.DEFAULT_THRESHOLD,
+) -> Path:
+    """Stream ``raw_path`` into a deduplicated, shuffled ``text,label`` CSV.
+
+    Besides exact duplicates, texts whose estimated shingle Jaccard
+    similarity to an earlier text reaches ``near_dup_threshold`` are dropped
+    (``None`` disables this). Memory is bounded by the dedup digests and
+    MinHash signatures plus ``2 * limit_per_label`` rows (or one shuffle
+    bucket when no limit is given). The output is written to a temporary
+    file and renamed into place, and is fully determined by ``seed``.
+    """
+    rng = random.Random(seed)
+    if near_dup_threshold:
+        rows = _near_dedup(raw_path, near_dup_threshold)
+    else:
+        rows = _dedup(_iter_answers(iter_raw_records(raw_path)))
+    output_path = Path(output_path)
+    ensure_directories(extra={output_path.parent})
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
     if limit_per_label:
-        balanced = []
-        rng = random.Random(42)
-        for label in ("ai", "human"):
-            subset = df[df["label"] == label]
-            if subset.empty:
-                continue
-            if len(subset) > limit_per_label:
-                sampled = subset.sample(limit_per_label, random_state=rng.randint(0, 2**32 - 1))
-            else:
-                sampled = subset
-            balanced.append(sampled)
-        if balanced:
-            df = pd.concat(balanced, ignore_index=True)
-    df = df.sample(frac=1.0, random_state=42).reset_index(drop=True)
-    return df
+        sampled = _reservoir_sample(rows, limit_per_label, rng)
+        rng.shuffle(sampled)
+        _write_rows(tmp_path, sampled)
+    else:
+        _external_shuffle(rows, tmp_path, rng)
+    os.replace(tmp_path, output_path)
+    return output_path
 
 
-def build_dataset(limit_per_label: int = 4000, force: bool = False) -> pd.DataFrame:
+def build_dataset(
+    limit_per_label: int = 4000,
+    force: bool = False,
+    near_dup_threshold: float | None = neardup.DEFAULT_THRESHOLD,
+) -> pd.DataFrame:
     """Create a processed CSV dataset from the raw JSONL file."""
     raw_path = download_raw_dataset(force=force)
-    records: List[dict] = []
-    with raw_path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            records.append(json.loads(line))
+    write_dataset(
+        raw_path,
+        PROCESSED_DATASET_PATH,
+        limit_per_label=limit_per_label,
+        near_dup_threshold=near_dup_threshold,
+    )
+    return pd.read_csv(PROCESSED_DATASET_PATH)
+
+
+def _stat_signature(path: Path) -> Dict[str, int] | None:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_cache_meta() -> Dict[str, object]:
+    if not PROCESSED_CACHE_META_PATH.exists():
+        return {}
+    try:
+        return json.loads(PROCESSED_CACHE_META_PATH.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
 
-    df = _flatten_answers(records, limit_per_label=limit_per_label)
-    ensure_directories(extra={PROCESSED_DATASET_PATH.parent})
-    df.to_csv(PROCESSED_DATASET_PATH, index=False)
+def _dataset_cache_key(meta: Dict[str, object]) -> Dict[str, object]:
+    # Re-hash the raw dump only when its size or mtime changed since the
+    # cache was written; hashing a multi-GB file costs more than the load.
+    raw_stat = _stat_signature(RAW_DATA_PATH)
+    cached_raw = meta.get("raw") or {}
+    if raw_stat is None:
+        raw_sha256 = None
+    elif cached_raw.get("stat") == raw_stat:
+        raw_sha256 = cached_raw.get("sha256")
+    else:
+        raw_sha256 = file_sha256(RAW_DATA_PATH)
+    return {
+        "raw": {"stat": raw_stat, "sha256": raw_sha256},
+        "csv": _stat_signature(PROCESSED_DATASET_PATH),
+    }
+
+
+def _write_dataset_cache(df: pd.DataFrame, key: Dict[str, object]) -> None:
+    tmp_path = PROCESSED_CACHE_PATH.with_name(PROCESSED_CACHE_PATH.name + ".tmp")
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except ImportError:
+        return
+    os.replace(tmp_path, PROCESSED_CACHE_PATH)
+    PROCESSED_CACHE_META_PATH.write_text(json.dumps(key, indent=2), encoding="utf-8")
+
+
+def _typed_labels(df: pd.DataFrame) -> pd.DataFrame:
+    df["label"] = df["label"].astype("category")
     return df
 
 
 def load_dataset(limit_per_label: int = 4000) -> pd.DataFrame:
-    """Load the processed dataset, building it if necessary."""
-    if PROCESSED_DATASET_PATH.exists():
-        return pd.read_csv(PROCESSED_DATASET_PATH)
-    return build_dataset(limit_per_label=limit_per_label)
+    """Load the processed dataset, building it if necessary.
+
+    The result is memoized as ``ai_human_dataset.parquet`` with ``label`` as a
+    categorical (int8 codes) column. The cache is reused while the raw file
+    hash and the processed CSV are unchanged. ``limit_per_label`` only applies
+    when the processed CSV has to be built; an existing CSV is never resampled.
+    """
+    if not PROCESSED_DATASET_PATH.exists():
+        write_dataset(download_raw_dataset(), limit_per_label=limit_per_label)
+
+    meta = _read_cache_meta()
+    key = _dataset_cache_key(meta)
+    if meta == key and PROCESSED_CACHE_PATH.exists():
+        try:
+            return pd.read_parquet(PROCESSED_CACHE_PATH)
+        except ImportError:
+            pass
+
+    df = _typed_labels(pd.read_csv(PROCESSED_DATASET_PATH))
+    _write_dataset_cache(df, key)
+    return df
+
+
+def read_labeled(source: Path, store: Path = LABELED_ADDITIONS_PATH) -> pd.DataFrame:
+    """Read ``{"text", "label"}`` JSONL records that are not in the additions store yet.
+
+    Texts are whitespace-normalized like the processed dataset; texts already
+    in the store (or repeated in ``source``) are skipped.
+    """
+    seen = set(load_labeled_additions(store)["text"].astype(str))
+    rows: List[Tuple[str, str]] = []
+    for line_number, record in enumerate(iter_raw_records(source), start=1):
+        text = _clean_text(str(record.get("text", "")))
+        label = str(record.get("label", "")).strip().lower()
+        if not text:
+            raise ValueError(f"{source}: record {line_number} has no text.")
+        if label not in ("ai", "human"):
+            raise ValueError(f"{source}: record {line_number} has label {label!r}.")
+        if text not in seen:
+            seen.add(text)
+            rows.append((text, label))
+    return pd.DataFrame(rows, columns=["text", "label"])
+
+
+def append_labeled(rows: pd.DataFrame, store: Path = LABELED_ADDITIONS_PATH) -> None:
+    """Append rows from ``read_labeled`` to the additions store."""
+    if rows.empty:
+        return
+    store = Path(store)
+    ensure_directories(extra={store.parent})
+    is_new = not store.exists()
+    with store.open("a", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        if is_new:
+            writer.writerow(["text", "label"])
+        writer.writerows(rows[["text", "label"]].itertuples(index=False))
+
+
+def load_labeled_additions(store: Path = LABELED_ADDITIONS_PATH) -> pd.DataFrame:
+    """Return every row stored with ``append_labeled`` (empty if none)."""
+    if not Path(store).exists():
+        return pd.DataFrame({"text": pd.Series(dtype=str), "label": pd.Series(dtype=str)})
+    return pd.read_csv(store, dtype=str)
+
 
+def iter_dataset_chunks(
+    chunksize: int = 10_000, limit_per_label: int = 4000
+) -> Iterator[pd.DataFrame]:
+    """Yield the processed dataset in ``chunksize``-row DataFrames."""
+    if not PROCESSED_DATASET_PATH.exists():
+        build_dataset(limit_per_label=limit_per_label)
+    with pd.read_csv(PROCESSED_DATASET_PATH, chunksize=chunksize) as reader:
+        yield from reader
@@ -0,0 +1,171 @@
+"""Streaming, resumable and checksum-verified dataset downloads.
+
+``download_file`` streams the body into ``<dest>.part`` in fixed-size chunks.
+If the transfer breaks, the next attempt (in this call or a later run) asks
+for the remaining bytes with an HTTP ``Range`` header. The finished file is
+checked against a SHA-256 and only then renamed over ``dest``, so ``dest``
+is either absent or complete.
+
+Run from ``Q1/`` with ``python -m ai_detector.download --splits open_qa finance``
+to fetch several HC3 splits concurrently.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable
+
+import requests
+
+from .fingerprint import file_sha256
+from .paths import HC3_BASE_URL, HC3_SPLITS, RAW_DATA_DIR, ensure_directories
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_RETRIES = 3
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+_TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def _advertised_sha256(response: requests.Response) -> str | None:
+    # Hugging Face serves LFS files with their SHA-256 as the (linked) ETag.
+    for header in ("X-Linked-Etag", "ETag"):
+        value = response.headers.get(header, "").removeprefix("W/").strip('"').lower()
+        if _SHA256_RE.match(value):
+            return value
+    return None
+
+
+def _fetch_into(
+    session: requests.Session, url: str, part: Path, timeout: float
+) -> str | None:
+    """Append the missing tail of ``url`` to ``part``; return the advertised hash."""
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # The partial file already holds every byte the server has.
+            return _advertised_sha256(response)
+        response.raise_for_status()
+        # A server that ignores Range answers 200 with the whole body.
+        mode = "ab" if response.status_code == 206 else "wb"
+        with part.open(mode) as handle:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                handle.write(chunk)
+        return _advertised_sha256(response)
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    sha256: str | None = None,
+    session: requests.Session | None = None,
+    timeout: float = 60,
+    retries: int = DEFAULT_RETRIES,
+) -> Path:
+    """Download ``url`` to ``dest``, resuming a previous partial transfer.
+
+    The result is checked against ``sha256`` if given, else against the hash
+    the server advertises in its ETag (if any). On a mismatch the partial
+    file is discarded and ``ValueError`` is raised.
+    """
+    dest = Path(dest)
+    ensure_directories(extra={dest.parent})
+    part = dest.with_name(dest.name + ".part")
+    session = session or requests.Session()
+    for attempt in range(retries + 1):
+        try:
+            advertised = _fetch_into(session, url, part, timeout)
+            break
+        except _TRANSIENT_ERRORS:
+            # Whatever reached the disk stays in ``part``; the retry resumes there.
+            if attempt == retries:
+                raise
+    expected = (sha256 or advertised or "").lower()
+    if expected:
+        actual = file_sha256(part)
+        if actual != expected:
+            part.unlink()
+            raise ValueError(f"Checksum mismatch for {url}: expected {expected}, got {actual}.")
+    os.replace(part, dest)
+    return dest
+
+
+def split_url(split: str, base_url: str = HC3_BASE_URL) -> str:
+    return f"{base_url}/{split}.jsonl"
+
+
+def download_splits(
+    splits: Iterable[str] = HC3_SPLITS,
+    dest_dir: Path = RAW_DATA_DIR,
+    base_url: str = HC3_BASE_URL,
+    checksums: Dict[str, str] | None = None,
+    force: bool = False,
+    max_workers: int = 4,
+) -> Dict[str, Path]:
+    """Fetch several HC3 splits concurrently; return ``{split: path}``.
+
+    Splits already on disk are skipped unless ``force`` is set.
+    """
+    checksums = checksums or {}
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for split in dict.fromkeys(splits):
+            dest = Path(dest_dir) / f"{split}.jsonl"
+            if dest.exists() and not force:
+                jobs[split] = None
+                continue
+            jobs[split] = pool.submit(
+                download_file, split_url(split, base_url), dest, checksums.get(split)
+            )
+        return {
+            split: Path(dest_dir) / f"{split}.jsonl" if job is None else job.result()
+            for split, job in jobs.items()
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download HC3 splits")
+    parser.add_argument(
+        "--splits",
+        nargs="+",
+        default=["open_qa"],
+        help=f"Splits to fetch (available: {', '.join(HC3_SPLITS)}).",
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=HC3_BASE_URL,
+        help="Base URL that serves <split>.jsonl; point it at a local mirror if needed.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of splits downloaded at the same time.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Download again even if the split is already on disk.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    paths = download_splits(
+        args.splits, base_url=args.base_url, force=args.force, max_workers=args.workers
+    )
+    print(json.dumps({split: str(path) for split, path in paths.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
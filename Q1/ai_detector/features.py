@@ -0,0 +1,128 @@
+"""Persistent document-term matrix cache for repeated training runs.
+
+The expensive part of fitting ``TfidfVectorizer`` is tokenizing and counting
+n-grams. That depends only on the texts and the analyzer settings, not on the
+train/test split, so we count every document once, store the CSR matrix and
+its sorted vocabulary, and rebuild a split-specific vectorizer from it:
+``min_df``/``max_df``/``max_features`` and the idf weights are recomputed from
+the training rows exactly as ``TfidfVectorizer.fit`` would.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from numbers import Integral
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import (
+    CountVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+
+from .paths import FEATURE_CACHE_DIR, ensure_directories
+
+# Only these settings change the raw n-gram counts; the pruning parameters
+# are applied per split and therefore do not belong in the cache key.
+_ANALYZER_PARAMS = (
+    "lowercase",
+    "stop_words",
+    "ngram_range",
+    "token_pattern",
+    "strip_accents",
+    "analyzer",
+)
+
+
+def analyzer_params(vectorizer: TfidfVectorizer) -> Dict[str, object]:
+    params = vectorizer.get_params()
+    return {name: params[name] for name in _ANALYZER_PARAMS}
+
+
+def dataset_fingerprint(texts: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cache_key(texts: Iterable[str], vectorizer: TfidfVectorizer) -> str:
+    params = json.dumps(analyzer_params(vectorizer), sort_keys=True, default=list)
+    payload = f"{dataset_fingerprint(texts)}:{params}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def load_or_build_counts(
+    texts: list[str], vectorizer: TfidfVectorizer, cache_dir: Path = FEATURE_CACHE_DIR
+) -> Tuple[np.ndarray, sp.csr_matrix]:
+    """Return ``(sorted_terms, counts)`` for ``texts``, building the cache on a miss."""
+    entry = Path(cache_dir) / cache_key(texts, vectorizer)
+    terms_path = entry / "vocabulary.npy"
+    counts_path = entry / "counts.npz"
+    if terms_path.exists() and counts_path.exists():
+        return np.load(terms_path), sp.load_npz(counts_path).tocsr()
+
+    counter = CountVectorizer(**analyzer_params(vectorizer))
+    counts = counter.fit_transform(texts).tocsr()
+    terms = counter.get_feature_names_out().astype(str)
+
+    ensure_directories(extra={entry})
+    tmp_counts = entry / "counts.tmp.npz"
+    sp.save_npz(tmp_counts, counts)
+    os.replace(tmp_counts, counts_path)
+    np.save(terms_path, terms)
+    return terms, counts
+
+
+def _prune_mask(counts: sp.csr_matrix, vectorizer: TfidfVectorizer) -> np.ndarray:
+    # Mirrors CountVectorizer._limit_features on a train-only vocabulary:
+    # terms absent from the training rows never enter that vocabulary.
+    n_docs = counts.shape[0]
+    dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+    max_df, min_df = vectorizer.max_df, vectorizer.min_df
+    high = max_df if isinstance(max_df, Integral) else max_df * n_docs
+    low = min_df if isinstance(min_df, Integral) else min_df * n_docs
+    mask = (dfs > 0) & (dfs <= high) & (dfs >= low)
+    limit = vectorizer.max_features
+    if limit is not None and mask.sum() > limit:
+        tfs = np.asarray(counts.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:limit]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    return mask
+
+
+def fit_vectorizer_from_counts(
+    vectorizer: TfidfVectorizer, terms: np.ndarray, train_counts: sp.csr_matrix
+) -> Tuple[TfidfVectorizer, np.ndarray]:
+    """Fit ``vectorizer`` from cached training counts.
+
+    Returns the fitted vectorizer and the kept column indices, which select
+    the same features from any other rows of the cached matrix.
+    """
+    columns = np.where(_prune_mask(train_counts.tocsr(), vectorizer))[0]
+    if len(columns) == 0:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    transformer = TfidfTransformer(
+        norm=vectorizer.norm,
+        use_idf=vectorizer.use_idf,
+        smooth_idf=vectorizer.smooth_idf,
+        sublinear_tf=vectorizer.sublinear_tf,
+    ).fit(train_counts[:, columns])
+    vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(terms[columns])}
+    vectorizer.fixed_vocabulary_ = False
+    vectorizer._tfidf = transformer
+    return vectorizer, columns
+
+
+def transform_counts(
+    vectorizer: TfidfVectorizer, counts: sp.csr_matrix, columns: np.ndarray
+) -> sp.csr_matrix:
+    """TF-IDF weight cached count rows with a vectorizer from ``fit_vectorizer_from_counts``."""
+    return vectorizer._tfidf.transform(counts[:, columns])
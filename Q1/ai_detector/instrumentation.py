@@ -0,0 +1,144 @@
+"""Opt-in timers, counters and latency histograms for the inference path.
+
+Instrumentation is off unless ``enable()`` is called or the
+``AI_DETECTOR_STATS=1`` environment variable is set. Call sites check
+``STATS.enabled`` before reading the clock, so the disabled cost is one
+attribute lookup per chunk.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from typing import Dict, List
+
+# Upper bounds in seconds, Prometheus-style (cumulative, implicit +Inf).
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Approximate a quantile as the upper bound of the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            running += bucket_count
+            if running >= rank:
+                return bound
+        return float("inf")
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return counters, gauges and per-stage latency summaries as plain data."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "total_seconds": round(histogram.total, 6),
+                    "mean_ms": round(1000.0 * histogram.total / histogram.count, 4)
+                    if histogram.count
+                    else 0.0,
+                    "p50_ms_le": 1000.0 * histogram.quantile(0.5),
+                    "p99_ms_le": 1000.0 * histogram.quantile(0.99),
+                }
+                for stage, histogram in sorted(self.histograms.items())
+            }
+            return {
+                "enabled": self.enabled,
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": dict(sorted(self.gauges.items())),
+                "stages": stages,
+            }
+
+    def to_prometheus(self, prefix: str = "ai_detector") -> str:
+        """Render the current values in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                lines.append(f"{prefix}_{name} {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+            if self.histograms:
+                metric = f"{prefix}_stage_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                running = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    running += bucket_count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {running}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+STATS = Instrumentation(enabled=os.environ.get("AI_DETECTOR_STATS") == "1")
+
+
+def enable() -> None:
+    STATS.enabled = True
+
+
+def disable() -> None:
+    STATS.enabled = False
@@ -0,0 +1,147 @@
+"""Sliding-window scoring for long documents.
+
+A long text is cut into overlapping word windows, every window is scored in
+the same chunked batch path as ``predict_batch`` and the window scores are
+aggregated into one document score. The windows carry character offsets
+into the original text, so a UI can highlight the spans that look generated
+without scoring each one separately.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from .evaluation import DEFAULT_THRESHOLD
+from .predictor import DEFAULT_BATCH_SIZE, _clean_chunks, current_model, score_chunks
+from .text import _clean_text
+
+DEFAULT_WINDOW_WORDS = 200
+AGGREGATES = ("mean", "max")
+
+_WORD_RE = re.compile(r"\S+")
+
+
+class Window(NamedTuple):
+    """Character span ``[start, end)`` of one window in the original text."""
+
+    start: int
+    end: int
+
+
+def iter_windows(
+    text: str, window_words: int = DEFAULT_WINDOW_WORDS, stride_words: int | None = None
+) -> Iterator[Window]:
+    """Yield windows of ``window_words`` words, starting every ``stride_words`` words.
+
+    The stride defaults to half a window. The last window is aligned to the
+    end of the text so every word is covered; a text shorter than one window
+    yields a single window.
+    """
+    if window_words < 1:
+        raise ValueError("window_words must be a positive integer.")
+    stride_words = stride_words or max(1, window_words // 2)
+    if not 0 < stride_words <= window_words:
+        raise ValueError("stride_words must be between 1 and window_words.")
+    spans = [match.span() for match in _WORD_RE.finditer(text)]
+    if not spans:
+        return
+    last_start = max(0, len(spans) - window_words)
+    starts = list(range(0, last_start + 1, stride_words))
+    if starts[-1] != last_start:
+        starts.append(last_start)
+    for first in starts:
+        last = min(first + window_words, len(spans)) - 1
+        yield Window(spans[first][0], spans[last][1])
+
+
+@dataclass
+class LongDocumentPrediction:
+    """Document-level score plus the score of every window it was built from."""
+
+    text: str
+    windows: List[Window]
+    window_ai_probability: np.ndarray
+    aggregate: str
+    threshold: float = DEFAULT_THRESHOLD
+
+    @property
+    def ai_probability(self) -> float:
+        if self.aggregate == "max":
+            return float(self.window_ai_probability.max())
+        return float(self.window_ai_probability.mean())
+
+    @property
+    def label(self) -> str:
+        return "ai" if self.ai_probability >= self.threshold else "human"
+
+    def segments(self) -> List[Tuple[int, int, float]]:
+        """Split the text at every window boundary and score each piece.
+
+        Returns non-overlapping ``(start, end, ai_probability)`` spans, each
+        scored as the mean of the windows that cover it; this is what the
+        Streamlit app shades.
+        """
+        starts = np.array([window.start for window in self.windows])
+        ends = np.array([window.end for window in self.windows])
+        bounds = np.unique(np.concatenate([starts, ends]))
+        total = np.zeros(len(bounds))
+        count = np.zeros(len(bounds))
+        np.add.at(total, np.searchsorted(bounds, starts), self.window_ai_probability)
+        np.add.at(total, np.searchsorted(bounds, ends), -self.window_ai_probability)
+        np.add.at(count, np.searchsorted(bounds, starts), 1)
+        np.add.at(count, np.searchsorted(bounds, ends), -1)
+        total, count = np.cumsum(total)[:-1], np.cumsum(count)[:-1]
+        return [
+            (int(start), int(end), float(score / covered))
+            for start, end, score, covered in zip(bounds[:-1], bounds[1:], total, count)
+            if covered > 0
+        ]
+
+    def to_record(self) -> Dict[str, object]:
+        return {
+            "label": self.label,
+            "ai_probability": self.ai_probability,
+            "human_probability": 1.0 - self.ai_probability,
+            "aggregate": self.aggregate,
+            "windows": [
+                {
+                    "start": window.start,
+                    "end": window.end,
+                    "ai_probability": float(score),
+                    "label": "ai" if score >= self.threshold else "human",
+                }
+                for window, score in zip(self.windows, self.window_ai_probability)
+            ],
+        }
+
+
+def predict_long_text(
+    text: str,
+    window_words: int = DEFAULT_WINDOW_WORDS,
+    stride_words: int | None = None,
+    aggregate: str = "mean",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LongDocumentPrediction:
+    """Score ``text`` window by window and aggregate with ``"mean"`` or ``"max"``.
+
+    Windows are vectorized ``batch_size`` at a time, so peak memory depends
+    on the window size rather than on the document length.
+    """
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"aggregate must be one of {AGGREGATES}.")
+    if not _clean_text(text):
+        raise ValueError("Input text cannot be empty.")
+    windows = list(iter_windows(text, window_words, stride_words))
+    window_texts = (text[window.start : window.end] for window in windows)
+    model = current_model()
+    scores = list(score_chunks(_clean_chunks(window_texts, batch_size), model=model))
+    return LongDocumentPrediction(
+        text=text,
+        windows=windows,
+        window_ai_probability=np.concatenate(scores),
+        aggregate=aggregate,
+        threshold=model.threshold,
+    )
@@ -1,46 +1,60 @@
-"""Model training and persistence utilities."""
+"""Model training and persistence utilities.
+
+The scoring path only needs ``load_operating_threshold`` (and, without a
+compact export, ``load_trained_model``) from here, so pandas, scikit-learn
+and joblib are imported inside the functions that use them.
+"""
 from __future__ import annotations
 
+import copy
 import json
+import zlib
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
 
 import numpy as np
-import pandas as pd
-from joblib import dump, load
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    f1_score,
-    precision_score,
-    recall_score,
-    roc_auc_score,
-)
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
 
+from .evaluation import DEFAULT_THRESHOLD, EvaluationResult, evaluate
+from .fingerprint import file_sha256
 from .paths import (
+    EVALUATION_REPORT_PATH,
+    HOLDOUT_PATH,
     METRICS_PATH,
     MODEL_PATH,
+    OPERATING_POINT_PATH,
     SAMPLES_PATH,
+    atomic_target,
     ensure_directories,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+
 
-def build_pipeline() -> Pipeline:
+def build_pipeline(
+    ngram_range: Tuple[int, int] = (1, 2),
+    max_features: int | None = 25000,
+    min_df: int | float = 2,
+    C: float = 1.0,
+    max_iter: int = 2000,
+) -> Pipeline:
     """Create the TF-IDF + Logistic Regression pipeline."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
     vectorizer = TfidfVectorizer(
         lowercase=True,
         stop_words="english",
-        ngram_range=(1, 2),
-        max_features=25000,
-        min_df=2,
+        ngram_range=tuple(ngram_range),
+        max_features=max_features,
+        min_df=min_df,
     )
     classifier = LogisticRegression(
-        max_iter=2000,
+        C=C,
+        max_iter=max_iter,
         class_weight="balanced",
         solver="lbfgs",
         n_jobs=None,
@@ -53,63 +67,339 @@ def build_pipeline() -> Pipeline:
     )
 
 
+def build_streaming_pipeline(n_features: int = 2**20, random_state: int = 42) -> Pipeline:
+    """Create a stateless hashing + SGD logistic pipeline for out-of-core training."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+
+    vectorizer = HashingVectorizer(
+        lowercase=True,
+        stop_words="english",
+        ngram_range=(1, 2),
+        n_features=n_features,
+        alternate_sign=False,
+        norm="l2",
+    )
+    classifier = SGDClassifier(
+        loss="log_loss",
+        alpha=1e-5,
+        random_state=random_state,
+    )
+    return Pipeline(
+        steps=[
+            ("hashing", vectorizer),
+            ("clf", classifier),
+        ]
+    )
+
+
 @dataclass
 class TrainingReport:
     pipeline: Pipeline
     metrics: Dict[str, float]
     classification_report: Dict[str, Dict[str, float]]
     samples: pd.DataFrame
+    threshold: float = DEFAULT_THRESHOLD
+    evaluation: Dict[str, object] | None = None
 
 
 def train_detector(
-    dataset: pd.DataFrame, test_size: float = 0.25, random_state: int = 42
+    dataset: pd.DataFrame,
+    test_size: float = 0.25,
+    random_state: int = 42,
+    use_feature_cache: bool = False,
+    pipeline_params: Dict[str, object] | None = None,
+    threshold_objective: str = "fixed",
+    bootstrap_resamples: int = 1000,
+    group_threshold: float | None = None,
 ) -> TrainingReport:
-    """Train the detector and compute evaluation metrics."""
+    """Train the detector and compute evaluation metrics.
+
+    ``pipeline_params`` are forwarded to ``build_pipeline``. With
+    ``use_feature_cache`` the n-gram count matrix of the whole dataset is
+    loaded from (or saved to) ``FEATURE_CACHE_DIR`` and the TF-IDF vectorizer
+    is refit from its training rows, giving the same model as a plain fit.
+    The operating threshold is chosen on the test split by
+    ``threshold_objective`` (see ``evaluation.OBJECTIVES``); ``"fixed"``
+    keeps 0.5. With ``group_threshold`` the split keeps every near-duplicate
+    group (see ``neardup``) on one side.
+    """
+    import pandas as pd
+
     if dataset.empty:
         raise ValueError("Dataset is empty – build_dataset must provide data.")
     X = dataset["text"].astype(str)
     y = dataset["label"].astype(str)
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state, stratify=y
-    )
+    groups = _near_duplicate_groups(X, group_threshold)
+    train_rows, test_rows = split_rows(y, test_size, random_state, groups=groups)
+    X_train, X_test = X.iloc[train_rows], X.iloc[test_rows]
+    y_train, y_test = y.iloc[train_rows], y.iloc[test_rows]
 
-    pipeline = build_pipeline()
-    pipeline.fit(X_train, y_train)
-    predictions = pipeline.predict(X_test)
-    probabilities = pipeline.predict_proba(X_test)
+    pipeline = build_pipeline(**(pipeline_params or {}))
+    if use_feature_cache:
+        from . import features
+
+        vectorizer = pipeline.named_steps["tfidf"]
+        classifier = pipeline.named_steps["clf"]
+        terms, counts = features.load_or_build_counts(X.tolist(), vectorizer)
+        _, columns = features.fit_vectorizer_from_counts(vectorizer, terms, counts[train_rows])
+        classifier.fit(
+            features.transform_counts(vectorizer, counts[train_rows], columns), y_train
+        )
+        test_features = features.transform_counts(vectorizer, counts[test_rows], columns)
+        probabilities = classifier.predict_proba(test_features)
+    else:
+        pipeline.fit(X_train, y_train)
+        probabilities = pipeline.predict_proba(X_test)
     ai_index = list(pipeline.classes_).index("ai")
     ai_probs = probabilities[:, ai_index]
 
-    metrics = {
-        "accuracy": round(float(accuracy_score(y_test, predictions)), 4),
-        "precision_ai": round(float(precision_score(y_test, predictions, pos_label="ai")), 4),
-        "recall_ai": round(float(recall_score(y_test, predictions, pos_label="ai")), 4),
-        "f1_ai": round(float(f1_score(y_test, predictions, pos_label="ai")), 4),
-        "roc_auc": round(
-            float(roc_auc_score((y_test == "ai").astype(int), ai_probs)), 4
-        ),
-    }
-    cls_report = classification_report(y_test, predictions, output_dict=True)
+    result = evaluate(
+        (y_test == "ai").to_numpy(),
+        ai_probs,
+        objective=threshold_objective,
+        n_resamples=bootstrap_resamples,
+        seed=random_state,
+    )
     samples = pd.DataFrame(
         {
             "text": X_test,
             "label": y_test,
-            "prediction": predictions,
+            "prediction": np.where(ai_probs >= result.threshold, "ai", "human"),
             "ai_probability": ai_probs,
         }
     ).reset_index(drop=True)
 
     return TrainingReport(
         pipeline=pipeline,
-        metrics=metrics,
-        classification_report=cls_report,
+        metrics=result.metrics,
+        classification_report=result.classification_report,
+        samples=samples,
+        threshold=result.threshold,
+        evaluation=result.report,
+    )
+
+
+def _near_duplicate_groups(texts: pd.Series, threshold: float | None) -> np.ndarray | None:
+    if not threshold:
+        return None
+    from . import neardup
+
+    return neardup.group_texts(texts, threshold=threshold)
+
+
+def split_rows(
+    labels: pd.Series,
+    test_size: float,
+    random_state: int,
+    groups: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stratified train/test row indices, shared by training and ``fixed_holdout``.
+
+    With ``groups`` rows of the same group always land on the same side.
+    """
+    if groups is not None:
+        from .neardup import group_positions
+
+        in_test = group_positions(labels, groups, random_state) < test_size
+        return np.flatnonzero(~in_test), np.flatnonzero(in_test)
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(
+        np.arange(len(labels)), test_size=test_size, random_state=random_state, stratify=labels
+    )
+
+
+def fixed_holdout(
+    dataset: pd.DataFrame,
+    test_size: float = 0.25,
+    random_state: int = 42,
+    path: Path = HOLDOUT_PATH,
+    group_threshold: float | None = None,
+) -> pd.DataFrame:
+    """Return the persisted evaluation holdout, creating it on first use.
+
+    It is the test split ``train_detector`` uses for the same arguments, so a
+    model trained by ``train.py`` has never seen it. Once written it stays
+    fixed, which keeps metrics comparable across incremental updates.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if path.exists():
+        return pd.read_csv(path, dtype=str)
+    groups = _near_duplicate_groups(dataset["text"].astype(str), group_threshold)
+    _, test_rows = split_rows(
+        dataset["label"].astype(str), test_size, random_state, groups=groups
+    )
+    holdout = dataset.iloc[test_rows][["text", "label"]].astype(str).reset_index(drop=True)
+    with atomic_target(path) as tmp:
+        holdout.to_csv(tmp, index=False)
+    return holdout
+
+
+def evaluate_pipeline(
+    pipeline: Pipeline,
+    holdout: pd.DataFrame,
+    threshold: float | None = None,
+    objective: str = "fixed",
+    bootstrap_resamples: int = 0,
+) -> EvaluationResult:
+    """Score ``holdout`` with ``pipeline`` at ``threshold`` (or one chosen by ``objective``)."""
+    ai_index = list(pipeline.classes_).index("ai")
+    ai_probs = pipeline.predict_proba(holdout["text"].astype(str))[:, ai_index]
+    return evaluate(
+        (holdout["label"].astype(str) == "ai").to_numpy(),
+        ai_probs,
+        objective=objective,
+        threshold=threshold,
+        n_resamples=bootstrap_resamples,
+    )
+
+
+def warm_start_update(
+    pipeline: Pipeline,
+    train: pd.DataFrame,
+    new: pd.DataFrame,
+    max_iter: int = 200,
+    epochs: int = 3,
+) -> Pipeline:
+    """Return a copy of ``pipeline`` updated with ``new`` labeled rows.
+
+    The vectorizer is reused as fitted, so n-grams that only occur in the new
+    rows are not added. A logistic regression restarts lbfgs from its current
+    coefficients on ``train`` plus ``new``, which converges in a fraction of a
+    cold fit. An SGD model from ``--streaming`` takes ``epochs`` more
+    ``partial_fit`` passes over ``new`` only.
+    """
+    import pandas as pd
+
+    updated = copy.deepcopy(pipeline)
+    classifier = updated[-1]
+    if hasattr(classifier, "partial_fit"):
+        if new.empty:
+            return updated
+        features = updated[:-1].transform(new["text"].astype(str))
+        labels = new["label"].astype(str).to_numpy()
+        for _ in range(epochs):
+            classifier.partial_fit(features, labels)
+        return updated
+
+    combined = pd.concat([train, new], ignore_index=True)
+    classifier.set_params(warm_start=True, max_iter=max_iter)
+    classifier.fit(
+        updated[:-1].transform(combined["text"].astype(str)), combined["label"].astype(str)
+    )
+    return updated
+
+
+def _holdout_mask(texts: pd.Series, test_size: float, random_state: int) -> np.ndarray:
+    # Hash-based assignment is stable across passes and chunk boundaries, so
+    # the streaming trainer never needs to hold the split in memory.
+    cutoff = int(test_size * 10_000)
+    return np.fromiter(
+        (
+            zlib.crc32(f"{random_state}:{text}".encode("utf-8")) % 10_000 < cutoff
+            for text in texts
+        ),
+        dtype=bool,
+        count=len(texts),
+    )
+
+
+def train_detector_streaming(
+    chunk_source: Callable[[], Iterable[pd.DataFrame]],
+    test_size: float = 0.25,
+    random_state: int = 42,
+    epochs: int = 3,
+    n_features: int = 2**20,
+    sample_limit: int = 200,
+    threshold_objective: str = "fixed",
+    bootstrap_resamples: int = 1000,
+) -> TrainingReport:
+    """Train out-of-core from DataFrame chunks with ``partial_fit``.
+
+    ``chunk_source`` must return a fresh iterator of ``text``/``label`` chunks
+    on every call; it is consumed ``epochs`` times for training and once more
+    for evaluation. Memory is bounded by the chunk size plus one float and one
+    label per held-out row. The threshold is chosen as in ``train_detector``.
+    """
+    import pandas as pd
+
+    pipeline = build_streaming_pipeline(n_features=n_features, random_state=random_state)
+    vectorizer = pipeline.named_steps["hashing"]
+    classifier = pipeline.named_steps["clf"]
+    classes = np.array(["ai", "human"])
+
+    seen = 0
+    for _ in range(epochs):
+        for chunk in chunk_source():
+            texts = chunk["text"].astype(str)
+            labels = chunk["label"].astype(str)
+            train_mask = ~_holdout_mask(texts, test_size, random_state)
+            if not train_mask.any():
+                continue
+            features = vectorizer.transform(texts[train_mask])
+            classifier.partial_fit(features, labels[train_mask].to_numpy(), classes=classes)
+            seen += int(train_mask.sum())
+    if not seen:
+        raise ValueError("Dataset is empty – build_dataset must provide data.")
+
+    y_parts: List[np.ndarray] = []
+    prob_parts: List[np.ndarray] = []
+    sample_parts: List[pd.DataFrame] = []
+    ai_index = list(classifier.classes_).index("ai")
+    kept_samples = 0
+    for chunk in chunk_source():
+        texts = chunk["text"].astype(str)
+        test_mask = _holdout_mask(texts, test_size, random_state)
+        if not test_mask.any():
+            continue
+        test_texts = texts[test_mask]
+        ai_probs = classifier.predict_proba(vectorizer.transform(test_texts))[:, ai_index]
+        y_parts.append(chunk["label"].astype(str)[test_mask].to_numpy())
+        prob_parts.append(ai_probs)
+        if kept_samples < sample_limit:
+            sample_parts.append(
+                pd.DataFrame(
+                    {
+                        "text": test_texts.to_numpy(),
+                        "label": y_parts[-1],
+                        "ai_probability": ai_probs,
+                    }
+                ).head(sample_limit - kept_samples)
+            )
+            kept_samples += len(sample_parts[-1])
+    if not y_parts:
+        raise ValueError("Holdout split is empty – increase test_size.")
+
+    result = evaluate(
+        np.concatenate(y_parts) == "ai",
+        np.concatenate(prob_parts),
+        objective=threshold_objective,
+        n_resamples=bootstrap_resamples,
+        seed=random_state,
+    )
+    samples = pd.concat(sample_parts, ignore_index=True)
+    samples.insert(
+        2, "prediction", np.where(samples["ai_probability"] >= result.threshold, "ai", "human")
+    )
+    return TrainingReport(
+        pipeline=pipeline,
+        metrics=result.metrics,
+        classification_report=result.classification_report,
         samples=samples,
+        threshold=result.threshold,
+        evaluation=result.report,
     )
 
 
 def save_model(pipeline: Pipeline, path=MODEL_PATH) -> str:
-    ensure_directories(extra={path.parent})
-    dump(pipeline, path)
+    from joblib import dump
+
+    with atomic_target(path) as tmp:
+        dump(pipeline, tmp)
     return str(path)
 
 
@@ -118,21 +408,62 @@ def save_metrics(
     cls_report: Dict[str, Dict[str, float]],
     path=METRICS_PATH,
 ) -> str:
-    ensure_directories(extra={path.parent})
     payload = {"summary": metrics, "classification_report": cls_report}
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    with atomic_target(path) as tmp:
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
     return str(path)
 
 
+def save_evaluation(report: Dict[str, object], path=EVALUATION_REPORT_PATH) -> str:
+    with atomic_target(path) as tmp:
+        tmp.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return str(path)
+
+
+def save_operating_point(
+    threshold: float,
+    objective: str,
+    model_path=MODEL_PATH,
+    path=OPERATING_POINT_PATH,
+) -> str:
+    """Record the threshold chosen for the model at ``model_path``.
+
+    The file carries the model's SHA-256 so a threshold is never applied to
+    a model it was not chosen for.
+    """
+    payload = {
+        "threshold": threshold,
+        "objective": objective,
+        "model_sha256": file_sha256(Path(model_path)),
+    }
+    with atomic_target(path) as tmp:
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return str(path)
+
+
+def load_operating_threshold(fingerprint: str, path=OPERATING_POINT_PATH) -> float:
+    """Threshold saved for the model with SHA-256 ``fingerprint``, else 0.5."""
+    path = Path(path)
+    if not path.exists():
+        return DEFAULT_THRESHOLD
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if payload.get("model_sha256") != fingerprint:
+        return DEFAULT_THRESHOLD
+    return float(payload["threshold"])
+
+
 def save_samples(samples: pd.DataFrame, path=SAMPLES_PATH, limit: int = 200) -> str:
     ensure_directories(extra={path.parent})
     samples.head(limit).to_csv(path, index=False)
     return str(path)
 
 
-def load_trained_model(path=MODEL_PATH) -> Pipeline:
+def load_trained_model(path=MODEL_PATH, mmap_mode: str | None = None) -> Pipeline:
+    """Load the pipeline; ``mmap_mode="r"`` maps its NumPy arrays read-only."""
+    from joblib import load
+
     if not Path(path).exists():
         raise FileNotFoundError(
             f"Model artifact not found at {path}. Run aiot_hw5/Q1/train.py first."
         )
-    return load(path)
+    return load(path, mmap_mode=mmap_mode)
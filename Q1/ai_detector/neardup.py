@@ -0,0 +1,202 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding.
+
+Each text is reduced to the set of its lowercased word ``SHINGLE_WORDS``-grams
+and summarized by ``num_perm`` MinHash values. The fraction of equal values
+in two signatures estimates the Jaccard similarity of their shingle sets.
+Signatures are cut into bands, and texts whose band values match land in
+the same bucket. Every bucket member is compared with the bucket's first
+member only, so the work grows with ``rows x bands`` rather than with the
+number of pairs. Confirmed links are merged into groups by connected
+components.
+
+Hashing and MinHash are vectorized over batches of texts; the only Python
+loop per text is ``str.split``.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+SHINGLE_WORDS = 3
+_BATCH_TEXTS = 4096
+_SHIFT = np.uint64(32)
+
+
+class MinHasher:
+    """Computes MinHash signatures of word-shingle sets.
+
+    The permutations are multiply-shift hashes ``(a * x + b) >> 32`` of the
+    64-bit shingle hashes, with seeded odd ``a``, so signatures are stable
+    across processes and runs.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_words: int = SHINGLE_WORDS,
+        seed: int = 1,
+    ) -> None:
+        if num_perm < 1 or shingle_words < 1:
+            raise ValueError("num_perm and shingle_words must be positive integers.")
+        rng = np.random.default_rng(seed)
+        odd = np.uint64(1)
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self._a = _random_uint64(rng, num_perm) | odd
+        self._b = _random_uint64(rng, num_perm)
+        # Position weights that combine consecutive word hashes into a shingle hash.
+        self._weights = _random_uint64(rng, shingle_words) | odd
+
+    def _shingle_hashes(self, texts: Sequence[str]) -> tuple:
+        from pandas.util import hash_array
+
+        words = [text.lower().split() for text in texts]
+        lengths = np.fromiter((len(ws) for ws in words), dtype=np.int64, count=len(words))
+        flat = np.array([word for ws in words for word in ws], dtype=object)
+        word_hashes = np.zeros(len(flat) + 1, dtype=np.uint64)
+        if len(flat):
+            word_hashes[:-1] = hash_array(flat, categorize=False)
+        # The trailing 0 keeps the gather below in bounds for texts without words.
+
+        k = self.shingle_words
+        counts = np.maximum(lengths - k + 1, 1)
+        word_starts = np.cumsum(lengths) - lengths
+        shingle_starts = np.cumsum(counts) - counts
+        owner = np.repeat(np.arange(len(texts)), counts)
+        first_word = word_starts[owner] + np.arange(counts.sum()) - shingle_starts[owner]
+        width = np.minimum(lengths[owner], k)
+        hashes = np.zeros(len(first_word), dtype=np.uint64)
+        for offset in range(k):
+            position = first_word + np.minimum(offset, np.maximum(width - 1, 0))
+            taken = np.where(offset < width, word_hashes[position], 0)
+            hashes += taken.astype(np.uint64) * self._weights[offset]
+        return hashes, shingle_starts
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """Return a ``(len(texts), num_perm)`` uint32 signature matrix."""
+        parts: List[np.ndarray] = []
+        for batch in _batched(texts, _BATCH_TEXTS):
+            hashes, starts = self._shingle_hashes(batch)
+            signature = np.empty((len(batch), self.num_perm), dtype=np.uint32)
+            values = np.empty_like(hashes)
+            for column, (a, b) in enumerate(zip(self._a, self._b)):
+                np.multiply(hashes, a, out=values)
+                np.add(values, b, out=values)
+                np.right_shift(values, _SHIFT, out=values)
+                signature[:, column] = np.minimum.reduceat(values, starts)
+            parts.append(signature)
+        if not parts:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        return np.concatenate(parts)
+
+
+def _random_uint64(rng: np.random.Generator, size: int) -> np.ndarray:
+    top = np.iinfo(np.uint64).max
+    return rng.integers(0, top, size=size, dtype=np.uint64, endpoint=True)
+
+
+def _batched(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def band_keys(signatures: np.ndarray, bands: int = DEFAULT_BANDS) -> np.ndarray:
+    """Collapse each band of every signature into one uint64 bucket key."""
+    n, num_perm = signatures.shape
+    if bands < 1 or num_perm % bands:
+        raise ValueError(f"bands must divide the signature length ({num_perm}).")
+    rows = signatures.reshape(n, bands, num_perm // bands).astype(np.uint64)
+    powers = np.arange(1, rows.shape[2] + 1, dtype=np.uint64)
+    multipliers = np.uint64(0x9E3779B97F4A7C15) ** powers
+    return (rows * multipliers).sum(axis=2, dtype=np.uint64)
+
+
+def near_duplicate_groups(
+    signatures: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+    bands: int = DEFAULT_BANDS,
+) -> np.ndarray:
+    """Label each signature with the id of its near-duplicate group.
+
+    Two rows are linked when they share a band bucket and their estimated
+    Jaccard similarity is at least ``threshold``. Groups are the connected
+    components of those links, so a chain of near-duplicates forms one
+    group. Ids are ``0..n_groups-1``.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(signatures)
+    if not n:
+        return np.empty(0, dtype=np.int64)
+    keys = band_keys(signatures, bands)
+    sources, targets = [], []
+    for band in range(bands):
+        _, first, inverse = np.unique(keys[:, band], return_index=True, return_inverse=True)
+        representative = first[inverse.ravel()]
+        members = np.flatnonzero(representative != np.arange(n))
+        if not members.size:
+            continue
+        agreement = (signatures[members] == signatures[representative[members]]).mean(axis=1)
+        similar = agreement >= threshold
+        sources.append(members[similar])
+        targets.append(representative[members[similar]])
+    if not sources:
+        return np.arange(n, dtype=np.int64)
+    rows, cols = np.concatenate(sources), np.concatenate(targets)
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return labels.astype(np.int64)
+
+
+def group_texts(
+    texts: Iterable[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+) -> np.ndarray:
+    """Near-duplicate group id of every text (see ``near_duplicate_groups``)."""
+    signatures = MinHasher(num_perm=num_perm).signatures(texts)
+    return near_duplicate_groups(signatures, threshold=threshold, bands=bands)
+
+
+def first_of_groups(groups: np.ndarray) -> np.ndarray:
+    """Boolean mask keeping the first row of every group."""
+    keep = np.zeros(len(groups), dtype=bool)
+    keep[np.unique(groups, return_index=True)[1]] = True
+    return keep
+
+
+def group_positions(
+    labels: Sequence[str], groups: np.ndarray, random_state: int = 42
+) -> np.ndarray:
+    """Place every row on ``[0, 1)`` so that whole groups stay together.
+
+    For each label, the groups whose first row carries it are shuffled and
+    laid end to end, each spanning its share of that label's rows; a row's
+    position is where its group starts. Cutting at ``test_size`` then gives
+    a group-aware split stratified by label, and cutting into ``k`` equal
+    slices gives group-aware folds.
+    """
+    labels = np.asarray(labels)
+    _, group_index, compact = np.unique(groups, return_index=True, return_inverse=True)
+    compact = compact.ravel()
+    sizes = np.bincount(compact).astype(float)
+    group_labels = labels[group_index]
+    starts = np.zeros(len(sizes))
+    rng = np.random.default_rng(random_state)
+    for label in np.unique(group_labels):
+        order = rng.permutation(np.flatnonzero(group_labels == label))
+        spans = sizes[order] / sizes[order].sum()
+        starts[order] = np.cumsum(spans) - spans
+    return starts[compact]
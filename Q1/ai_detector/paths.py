@@ -1,25 +1,45 @@
 """Centralized path helpers for the AI vs Human detector project."""
 from __future__ import annotations
 
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 BASE_DIR: Path = Path(__file__).resolve().parents[1]
 DATA_DIR: Path = BASE_DIR / "data"
 RAW_DATA_DIR: Path = DATA_DIR / "raw"
 PROCESSED_DATA_DIR: Path = DATA_DIR / "processed"
+LABELED_DATA_DIR: Path = DATA_DIR / "labeled"
+SHARDS_DIR: Path = DATA_DIR / "shards"
 ARTIFACTS_DIR: Path = BASE_DIR / "artifacts"
 REPORTS_DIR: Path = BASE_DIR / "reports"
+CACHE_DIR: Path = DATA_DIR / "cache"
+FEATURE_CACHE_DIR: Path = CACHE_DIR / "features"
+PREDICTION_CACHE_PATH: Path = CACHE_DIR / "predictions.sqlite"
 
 RAW_DATA_PATH: Path = RAW_DATA_DIR / "open_qa.jsonl"
 PROCESSED_DATASET_PATH: Path = PROCESSED_DATA_DIR / "ai_human_dataset.csv"
+PROCESSED_CACHE_PATH: Path = PROCESSED_DATA_DIR / "ai_human_dataset.parquet"
+PROCESSED_CACHE_META_PATH: Path = PROCESSED_DATA_DIR / "ai_human_dataset.parquet.json"
+HOLDOUT_PATH: Path = PROCESSED_DATA_DIR / "holdout.csv"
+LABELED_ADDITIONS_PATH: Path = LABELED_DATA_DIR / "additions.csv"
 MODEL_PATH: Path = ARTIFACTS_DIR / "ai_human_detector.joblib"
+COMPACT_MODEL_DIR: Path = ARTIFACTS_DIR / "ai_human_detector_compact"
+OPERATING_POINT_PATH: Path = ARTIFACTS_DIR / "operating_point.json"
+REGISTRY_DIR: Path = ARTIFACTS_DIR / "registry"
+REGISTRY_CURRENT_PATH: Path = REGISTRY_DIR / "CURRENT"
 METRICS_PATH: Path = REPORTS_DIR / "metrics.json"
 SAMPLES_PATH: Path = REPORTS_DIR / "sample_predictions.csv"
+EVALUATION_REPORT_PATH: Path = REPORTS_DIR / "evaluation.json"
+TUNING_LEADERBOARD_PATH: Path = REPORTS_DIR / "tuning_leaderboard.csv"
+BENCHMARK_RESULTS_PATH: Path = REPORTS_DIR / "benchmark_results.json"
+BENCHMARK_BASELINE_PATH: Path = REPORTS_DIR / "benchmark_baseline.json"
 
-HC3_OPEN_QA_URL = (
-    "https://huggingface.co/datasets/Hello-SimpleAI/HC3/resolve/main/open_qa.jsonl"
-)
+HC3_BASE_URL = "https://huggingface.co/datasets/Hello-SimpleAI/HC3/resolve/main"
+HC3_SPLITS = ("open_qa", "finance", "medicine", "reddit_eli5", "wiki_csai")
+HC3_OPEN_QA_URL = f"{HC3_BASE_URL}/open_qa.jsonl"
 
 
 def ensure_directories(extra: Iterable[Path] | None = None) -> None:
@@ -36,3 +56,23 @@ def ensure_directories(extra: Iterable[Path] | None = None) -> None:
     for directory in directories:
         directory.mkdir(parents=True, exist_ok=True)
 
+
+@contextmanager
+def atomic_target(path: Path) -> Iterator[Path]:
+    """Yield a temporary sibling of ``path`` and move it into place on success.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. The temporary file is removed if the block raises.
+    """
+    path = Path(path)
+    ensure_directories(extra={path.parent})
+    handle, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    os.close(handle)
+    tmp = Path(tmp_name)
+    tmp.chmod(0o644)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
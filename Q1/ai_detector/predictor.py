@@ -1,39 +1,492 @@
-"""Inference helpers used by the CLI and Streamlit demo."""
+"""Inference helpers used by the CLI and Streamlit demo.
+
+Importing this module must stay cheap: with a compact export the scoring
+path needs only NumPy. scikit-learn is imported when a joblib pipeline has
+to be unpickled, the process pool machinery when ``n_jobs > 1``, and pandas
+not at all. ``benchmark.py --check-imports`` enforces this.
+"""
 from __future__ import annotations
 
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Sequence, Tuple
 
-from sklearn.pipeline import Pipeline
+import numpy as np
 
-from .model import load_trained_model
-from .paths import METRICS_PATH
+from . import registry
+from .cache import PredictionCache, cache_key
+from .compact import CompactScorer, load_compact_model
+from .evaluation import DEFAULT_THRESHOLD
+from .fingerprint import file_sha256
+from .instrumentation import STATS
+from .model import load_operating_threshold, load_trained_model
+from .paths import METRICS_PATH, MODEL_PATH
+from .text import _clean_text
 
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
-@lru_cache(maxsize=1)
-def _cached_model() -> Pipeline:
-    return load_trained_model()
+DEFAULT_BATCH_SIZE = 1024
 
 
-def predict_text(text: str) -> Dict[str, float | str]:
-    """Return AI and Human probabilities for a piece of text."""
-    clean_text = (text or "").strip()
-    if not clean_text:
-        raise ValueError("Input text cannot be empty.")
+# How often serving code re-reads the registry pointer (or stats the legacy
+# artifact) to notice a newly published model.
+RELOAD_CHECK_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A scorer together with the artifact identity it was loaded from.
+
+    ``threshold`` is the operating point chosen for this artifact at training
+    time: texts scoring at or above it are labeled "ai".
+    """
+
+    scorer: CompactScorer | Pipeline
+    fingerprint: str
+    version: str | None
+    stamp: Tuple
+    threshold: float = DEFAULT_THRESHOLD
+
+
+def _artifact_stamp() -> Tuple:
+    # Registry versions are immutable, so their id identifies the content;
+    # the legacy single-file artifact is identified by its stat.
+    version = registry.current_version()
+    if version is not None:
+        return ("registry", version)
+    if MODEL_PATH.exists():
+        stat = MODEL_PATH.stat()
+        return ("file", stat.st_mtime_ns, stat.st_size)
+    return ("missing",)
+
+
+def _load_scorer(stamp: Tuple, mmap_mode: str | None = None) -> LoadedModel:
+    # Prefer the compact NumPy export: it loads in milliseconds and gives the
+    # same probabilities. Fall back to the joblib pipeline when the export is
+    # missing or was produced from a different artifact.
+    started = time.perf_counter()
+    if stamp[0] == "registry":
+        version = stamp[1]
+        root = registry.version_dir(version)
+        manifest = registry.read_manifest(version)
+        fingerprint = str(manifest["model_sha256"])
+        threshold = float(manifest.get("threshold", DEFAULT_THRESHOLD))
+        try:
+            scorer = load_compact_model(root / registry.COMPACT_DIRNAME, source=None)
+        except (FileNotFoundError, ValueError):
+            scorer = load_trained_model(root / registry.MODEL_FILENAME, mmap_mode=mmap_mode)
+    else:
+        version = None
+        fingerprint = file_sha256(MODEL_PATH) if MODEL_PATH.exists() else ""
+        threshold = load_operating_threshold(fingerprint)
+        try:
+            scorer = load_compact_model()
+        except (FileNotFoundError, ValueError):
+            scorer = load_trained_model(mmap_mode=mmap_mode)
+    if STATS.enabled:
+        STATS.set_gauge("model_load_seconds", time.perf_counter() - started)
+        STATS.set_gauge("model_compact", float(isinstance(scorer, CompactScorer)))
+        STATS.incr("model_loads_total")
+    return LoadedModel(
+        scorer=scorer,
+        fingerprint=fingerprint,
+        version=version,
+        stamp=stamp,
+        threshold=threshold,
+    )
+
+
+class _ModelHandle:
+    """Holds the served model and swaps in a new version when one is published.
+
+    The artifact is checked at most every ``RELOAD_CHECK_SECONDS``. Loading
+    happens in whichever thread notices the change while the others keep
+    using the previous model, and callers hold on to the ``LoadedModel`` they
+    started with, so in-flight batches finish on a consistent version.
+    """
+
+    def __init__(self, check_seconds: float = RELOAD_CHECK_SECONDS) -> None:
+        self.check_seconds = check_seconds
+        self._loaded: LoadedModel | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> LoadedModel:
+        loaded = self._loaded
+        if loaded is not None and time.monotonic() < self._next_check:
+            return loaded
+        if not self._lock.acquire(blocking=loaded is None):
+            return loaded
+        try:
+            if self._loaded is not None and time.monotonic() < self._next_check:
+                return self._loaded
+            stamp = _artifact_stamp()
+            if self._loaded is None or stamp != self._loaded.stamp:
+                try:
+                    self._loaded = _load_scorer(stamp)
+                except (FileNotFoundError, ValueError, OSError):
+                    # Keep serving the model we have; the next check retries.
+                    if self._loaded is None:
+                        raise
+                    if STATS.enabled:
+                        STATS.incr("model_reload_failures_total")
+            self._next_check = time.monotonic() + self.check_seconds
+            return self._loaded
+        finally:
+            self._lock.release()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._loaded = None
+            self._next_check = 0.0
+
+
+_model_handle = _ModelHandle()
+
+
+def current_model() -> LoadedModel:
+    """Return the served model, reloading it if a new version was published."""
+    return _model_handle.get()
+
+
+_prediction_cache: PredictionCache | None = None
+
+
+def enable_cache(
+    max_entries: int = 10_000, sqlite_path: Path | None = None
+) -> PredictionCache:
+    """Put a prediction cache in front of all scoring in this process."""
+    global _prediction_cache
+    disable_cache()
+    _prediction_cache = PredictionCache(max_entries=max_entries, sqlite_path=sqlite_path)
+    return _prediction_cache
+
+
+def disable_cache() -> None:
+    global _prediction_cache
+    if _prediction_cache is not None:
+        _prediction_cache.close()
+    _prediction_cache = None
+
+
+def cache_stats() -> Dict[str, float] | None:
+    return _prediction_cache.stats() if _prediction_cache is not None else None
+
+
+@dataclass
+class BatchPrediction:
+    """Columnar prediction output: one entry per input text, in input order."""
+
+    labels: np.ndarray
+    ai_probability: np.ndarray
+    human_probability: np.ndarray
+    explanations: List[List[Dict[str, float | str]]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def to_records(self) -> List[Dict[str, object]]:
+        """Return the row-oriented form used by ``predict_text``."""
+        records: List[Dict[str, object]] = [
+            {
+                "label": str(label),
+                "ai_probability": float(ai_prob),
+                "human_probability": float(human_prob),
+            }
+            for label, ai_prob, human_prob in zip(
+                self.labels, self.ai_probability, self.human_probability
+            )
+        ]
+        if self.explanations is not None:
+            for record, explanation in zip(records, self.explanations):
+                record["explanation"] = explanation
+        return records
+
+
+def _score_chunk(scorer: CompactScorer | Pipeline, texts: Sequence[str]) -> np.ndarray:
+    if not texts:
+        return np.empty(0, dtype=float)
+    ai_index = list(scorer.classes_).index("ai")
+    if not STATS.enabled:
+        return scorer.predict_proba(list(texts))[:, ai_index]
+
+    # Same computation split in two, so vectorizing and scoring are timed apart.
+    started = time.perf_counter()
+    if isinstance(scorer, CompactScorer):
+        features = scorer.transform(list(texts))
+        transformed = time.perf_counter()
+        probabilities = scorer.predict_proba_features(features)
+    else:
+        features = scorer[:-1].transform(list(texts))
+        transformed = time.perf_counter()
+        probabilities = scorer[-1].predict_proba(features)
+    finished = time.perf_counter()
+    STATS.observe("transform", transformed - started)
+    STATS.observe("score", finished - transformed)
+    STATS.incr("chunks_total")
+    STATS.incr("documents_scored_total", len(texts))
+    return probabilities[:, ai_index]
+
 
-    pipeline = _cached_model()
-    probabilities = pipeline.predict_proba([clean_text])[0]
-    classes = list(pipeline.classes_)
-    ai_index = classes.index("ai")
-    ai_probability = float(probabilities[ai_index])
+def supports_explanations(scorer: CompactScorer | Pipeline) -> bool:
+    """Whether the model has n-gram names to explain scores with.
 
-    return {
-        "label": "ai" if ai_probability >= 0.5 else "human",
-        "ai_probability": ai_probability,
-        "human_probability": 1.0 - ai_probability,
-    }
+    The ``--streaming`` model hashes n-grams into columns and keeps no
+    vocabulary, so its columns cannot be mapped back to text.
+    """
+    if isinstance(scorer, CompactScorer):
+        return True
+    return getattr(scorer[0], "vocabulary_", None) is not None
+
+
+@lru_cache(maxsize=2)
+def _feature_names(scorer: Pipeline) -> np.ndarray:
+    # get_feature_names_out rebuilds a 25k-string array on every call; keep it
+    # per loaded pipeline so explanations cost about as much as scoring.
+    return scorer[:-1].get_feature_names_out()
+
+
+def _explain_chunk(
+    scorer: CompactScorer | Pipeline, texts: Sequence[str], top_k: int
+) -> Tuple[np.ndarray, List[List[Dict[str, float | str]]]]:
+    """Score ``texts`` and list the n-grams that moved each score the most.
+
+    The model is linear in the TF-IDF features, so each n-gram's share of the
+    log-odds is its weight times its coefficient. Both the probabilities and
+    the contributions come from the same feature rows. Contributions are
+    signed towards "ai"; with the ``intercept`` entry they sum to the logit.
+    """
+    ai_index = list(scorer.classes_).index("ai")
+    sign = 1.0 if ai_index == 1 else -1.0
+    if isinstance(scorer, CompactScorer):
+        features = scorer.transform(list(texts))
+        probabilities = scorer.predict_proba_features(features)
+        docs, cols, weights = features.docs, features.cols, features.weights
+        coef, names, intercept = scorer.coef, scorer.terms, scorer.intercept
+    else:
+        matrix = scorer[:-1].transform(list(texts))
+        probabilities = scorer[-1].predict_proba(matrix)
+        coo = matrix.tocoo()
+        docs, cols, weights = coo.row, coo.col, coo.data
+        coef, names = scorer[-1].coef_[0], _feature_names(scorer)
+        intercept = float(scorer[-1].intercept_[0])
+
+    contributions = sign * np.asarray(coef)[cols] * weights
+    order = np.argsort(docs, kind="stable")
+    bounds = np.searchsorted(docs[order], np.arange(len(texts) + 1))
+    explanations: List[List[Dict[str, float | str]]] = []
+    for doc in range(len(texts)):
+        entries = order[bounds[doc] : bounds[doc + 1]]
+        if len(entries) > top_k:
+            keep = np.argpartition(-np.abs(contributions[entries]), top_k - 1)[:top_k]
+            entries = entries[keep]
+        entries = entries[np.argsort(-np.abs(contributions[entries]))]
+        explanation: List[Dict[str, float | str]] = [
+            {
+                "ngram": str(names[cols[entry]]),
+                "tfidf": float(weights[entry]),
+                "contribution": float(contributions[entry]),
+            }
+            for entry in entries
+        ]
+        explanation.append(
+            {"ngram": "intercept", "tfidf": 1.0, "contribution": sign * intercept}
+        )
+        explanations.append(explanation)
+    return probabilities[:, ai_index], explanations
+
+
+_worker_scorer: CompactScorer | Pipeline | None = None
+
+
+def _init_worker(stamp: Tuple) -> None:
+    # Each worker maps the artifact's arrays read-only, so the coefficient and
+    # idf buffers are shared through the page cache instead of copied. The
+    # parent passes its stamp so workers load the same version it resolved.
+    global _worker_scorer
+    _worker_scorer = _load_scorer(stamp, mmap_mode="r").scorer
+
+
+def _score_in_worker(texts: Sequence[str]) -> np.ndarray:
+    return _score_chunk(_worker_scorer, texts)
+
+
+def score_chunks(
+    chunks: Iterable[Sequence[str]], n_jobs: int = 1, model: LoadedModel | None = None
+) -> Iterator[np.ndarray]:
+    """Yield the AI probability array of every chunk, in input order.
+
+    With ``n_jobs > 1`` chunks are scored in a process pool. At most
+    ``2 * n_jobs`` chunks are in flight, so ``chunks`` may be an unbounded
+    generator. Pool workers do not report stage timings; the parent still
+    counts chunks and documents. When ``enable_cache`` is active, cached
+    texts are not rescored. Pass ``model`` (from ``current_model``) to pin
+    the version, e.g. to label the scores with its threshold afterwards.
+    """
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive integer.")
+    model = model or current_model()
+    if _prediction_cache is not None:
+        yield from _score_chunks_cached(chunks, n_jobs, model, _prediction_cache)
+        return
+    yield from _score_chunks_uncached(chunks, n_jobs, model)
+
+
+def _score_chunks_cached(
+    chunks: Iterable[Sequence[str]],
+    n_jobs: int,
+    model: LoadedModel,
+    cache: PredictionCache,
+) -> Iterator[np.ndarray]:
+    # Only distinct cache misses are sent to the scorer; hits and in-chunk
+    # duplicates are filled back in afterwards, preserving input order.
+    fingerprint = model.fingerprint
+    cache.use_model(fingerprint)
+    pending: Deque[Tuple[List[str], Dict[str, float], List[str]]] = deque()
+
+    def misses() -> Iterator[List[str]]:
+        for chunk in chunks:
+            keys = [cache_key(text, fingerprint) for text in chunk]
+            found = cache.get_many(keys)
+            miss_texts: Dict[str, str] = {}
+            for key, text in zip(keys, chunk):
+                if key not in found:
+                    miss_texts.setdefault(key, text)
+            pending.append((keys, found, list(miss_texts)))
+            yield list(miss_texts.values())
+
+    for scores in _score_chunks_uncached(misses(), n_jobs, model):
+        keys, found, miss_keys = pending.popleft()
+        fresh = dict(zip(miss_keys, scores.tolist()))
+        cache.put_many(fresh)
+        found.update(fresh)
+        if STATS.enabled:
+            STATS.incr("cache_hits_total", len(keys) - len(miss_keys))
+            STATS.incr("cache_misses_total", len(miss_keys))
+        yield np.array([found[key] for key in keys], dtype=float)
+
+
+def _score_chunks_uncached(
+    chunks: Iterable[Sequence[str]], n_jobs: int, model: LoadedModel
+) -> Iterator[np.ndarray]:
+    if n_jobs == 1:
+        for chunk in chunks:
+            yield _score_chunk(model.scorer, chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=_init_worker, initargs=(model.stamp,)
+    ) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_in_worker, list(chunk)))
+            if len(pending) >= 2 * n_jobs:
+                yield _collect_pooled(pending.popleft())
+        while pending:
+            yield _collect_pooled(pending.popleft())
+
+
+def _collect_pooled(future: Future) -> np.ndarray:
+    scores = future.result()
+    if STATS.enabled:
+        STATS.incr("chunks_total")
+        STATS.incr("documents_scored_total", len(scores))
+    return scores
+
+
+def _clean_chunks(texts: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    cleaning = 0.0
+    for position, text in enumerate(texts):
+        if STATS.enabled:
+            started = time.perf_counter()
+            clean_text = _clean_text(text)
+            cleaning += time.perf_counter() - started
+        else:
+            clean_text = _clean_text(text)
+        if not clean_text:
+            raise ValueError(f"Input text at position {position} cannot be empty.")
+        chunk.append(clean_text)
+        if len(chunk) == batch_size:
+            if STATS.enabled:
+                STATS.observe("clean", cleaning)
+                cleaning = 0.0
+            yield chunk
+            chunk = []
+    if chunk:
+        if STATS.enabled:
+            STATS.observe("clean", cleaning)
+        yield chunk
+
+
+def predict_batch(
+    texts: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_jobs: int = 1,
+    explain: bool = False,
+    top_k: int = 10,
+) -> BatchPrediction:
+    """Score many texts, vectorizing them ``batch_size`` at a time.
+
+    ``n_jobs > 1`` spreads the chunks over a process pool; results keep the
+    input order. Labels use the served model's operating threshold.
+    ``explain=True`` also returns the ``top_k`` n-grams behind
+    each score; it needs the feature rows, so it scores in this process and
+    bypasses the prediction cache.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    if explain and top_k < 1:
+        raise ValueError("top_k must be a positive integer.")
+
+    started = time.perf_counter() if STATS.enabled else 0.0
+    explanations: List[List[Dict[str, float | str]]] | None = None
+    model = current_model()
+    if explain and not supports_explanations(model.scorer):
+        raise ValueError(
+            "Explanations need a vocabulary-based model; the current model hashes "
+            "its n-grams (train.py --streaming). Retrain without --streaming."
+        )
+    if explain:
+        scores, explanations = [], []
+        for chunk in _clean_chunks(texts, batch_size):
+            chunk_scores, chunk_explanations = _explain_chunk(model.scorer, chunk, top_k)
+            scores.append(chunk_scores)
+            explanations.extend(chunk_explanations)
+    else:
+        scores = list(
+            score_chunks(_clean_chunks(texts, batch_size), n_jobs=n_jobs, model=model)
+        )
+    ai_probability = np.concatenate(scores) if scores else np.empty(0, dtype=float)
+    if STATS.enabled:
+        STATS.observe("predict_batch", time.perf_counter() - started)
+        STATS.incr("predict_batch_calls_total")
+    return BatchPrediction(
+        labels=np.where(ai_probability >= model.threshold, "ai", "human"),
+        ai_probability=ai_probability,
+        human_probability=1.0 - ai_probability,
+        explanations=explanations,
+    )
+
+
+def predict_text(text: str, explain: bool = False, top_k: int = 10) -> Dict[str, object]:
+    """Return AI and Human probabilities for a piece of text.
+
+    With ``explain=True`` the result also has an ``explanation`` list of the
+    n-grams that contributed most, signed towards AI.
+    """
+    if not _clean_text(text):
+        raise ValueError("Input text cannot be empty.")
+    return predict_batch([text], explain=explain, top_k=top_k).to_records()[0]
 
 
 def load_metrics() -> Dict[str, float]:
@@ -42,4 +495,3 @@ def load_metrics() -> Dict[str, float]:
     if not path.exists():
         return {}
     return json.loads(path.read_text(encoding="utf-8"))
-
@@ -0,0 +1,152 @@
+"""Versioned model registry with an atomically switched ``CURRENT`` pointer.
+
+Every published model gets an immutable directory under ``REGISTRY_DIR``::
+
+    registry/
+        CURRENT                       # id of the version being served
+        20240101-120000-1a2b3c4d/
+            model.joblib
+            compact/                  # NumPy export, when the pipeline supports it
+            manifest.json             # metrics, threshold, sha256 of model.joblib, parent id
+
+A version directory is assembled under a temporary name and renamed into
+place, and ``CURRENT`` is replaced with ``os.replace``, so a reader never
+observes a half-written model. Rolling back is ``set_current(older_id)``.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List
+
+from .compact import export_compact
+from .evaluation import DEFAULT_THRESHOLD
+from .fingerprint import file_sha256
+from .model import load_operating_threshold, save_model
+from .paths import (
+    MODEL_PATH,
+    REGISTRY_CURRENT_PATH,
+    REGISTRY_DIR,
+    atomic_target,
+    ensure_directories,
+)
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+MODEL_FILENAME = "model.joblib"
+COMPACT_DIRNAME = "compact"
+MANIFEST_FILENAME = "manifest.json"
+
+
+def version_dir(version: str, registry_dir: Path = REGISTRY_DIR) -> Path:
+    return Path(registry_dir) / version
+
+
+def current_version(registry_dir: Path = REGISTRY_DIR) -> str | None:
+    """Return the id in ``CURRENT``, or ``None`` if nothing has been published."""
+    pointer = Path(registry_dir) / REGISTRY_CURRENT_PATH.name
+    try:
+        version = pointer.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def current_model_path(registry_dir: Path = REGISTRY_DIR) -> Path:
+    """Joblib artifact of the current version, or ``MODEL_PATH`` without a registry."""
+    version = current_version(registry_dir)
+    if version is None:
+        return MODEL_PATH
+    return version_dir(version, registry_dir) / MODEL_FILENAME
+
+
+def read_manifest(version: str, registry_dir: Path = REGISTRY_DIR) -> Dict[str, object]:
+    path = version_dir(version, registry_dir) / MANIFEST_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"No registered model version {version!r} in {registry_dir}.")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def current_threshold(registry_dir: Path = REGISTRY_DIR) -> float:
+    """Operating threshold of the current version (or of the legacy artifact)."""
+    version = current_version(registry_dir)
+    if version is None:
+        if not MODEL_PATH.exists():
+            return DEFAULT_THRESHOLD
+        return load_operating_threshold(file_sha256(MODEL_PATH))
+    return float(read_manifest(version, registry_dir).get("threshold", DEFAULT_THRESHOLD))
+
+
+def list_versions(registry_dir: Path = REGISTRY_DIR) -> List[Dict[str, object]]:
+    """Return the manifest of every published version, oldest first."""
+    registry_dir = Path(registry_dir)
+    if not registry_dir.exists():
+        return []
+    manifests = [
+        json.loads((entry / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+        for entry in sorted(registry_dir.iterdir())
+        if (entry / MANIFEST_FILENAME).exists()
+    ]
+    return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+
+def set_current(version: str, registry_dir: Path = REGISTRY_DIR) -> None:
+    """Point ``CURRENT`` at an existing version; serving processes pick it up."""
+    read_manifest(version, registry_dir)
+    with atomic_target(Path(registry_dir) / REGISTRY_CURRENT_PATH.name) as tmp:
+        tmp.write_text(version + "\n", encoding="utf-8")
+
+
+def publish(
+    pipeline: Pipeline,
+    metrics: Dict[str, float],
+    params: Dict[str, object] | None = None,
+    promote: bool = True,
+    registry_dir: Path = REGISTRY_DIR,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> str:
+    """Store ``pipeline`` as a new version and, if ``promote``, make it current.
+
+    The compact export is included whenever the pipeline is a TF-IDF + LR
+    model. ``threshold`` is the operating point predictions of this version
+    use. Returns the new version id.
+    """
+    registry_dir = Path(registry_dir)
+    ensure_directories(extra={registry_dir})
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=registry_dir))
+    staging.chmod(0o755)
+    try:
+        model_path = staging / MODEL_FILENAME
+        save_model(pipeline, model_path)
+        sha256 = file_sha256(model_path)
+        compact = "tfidf" in pipeline.named_steps
+        if compact:
+            export_compact(pipeline, path=staging / COMPACT_DIRNAME, source=model_path)
+
+        version = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{sha256[:8]}"
+        manifest = {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "model_sha256": sha256,
+            "compact": compact,
+            "parent": current_version(registry_dir),
+            "threshold": threshold,
+            "metrics": metrics,
+            "params": params or {},
+        }
+        (staging / MANIFEST_FILENAME).write_text(
+            json.dumps(manifest, indent=2, default=str), encoding="utf-8"
+        )
+        target = version_dir(version, registry_dir)
+        if not target.exists():
+            staging.rename(target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    if promote:
+        set_current(version, registry_dir)
+    return version
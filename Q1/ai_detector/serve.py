@@ -0,0 +1,269 @@
+"""Local HTTP inference server with request micro-batching.
+
+Run from ``Q1/`` with ``python -m ai_detector.serve``. The model is loaded
+once at startup; concurrent requests are coalesced into a single
+``predict_batch`` call of up to ``--max-batch-size`` texts, waiting at most
+``--max-wait-ms`` for a batch to fill. A ``/predict_batch`` request larger
+than that is split, so no single call ever vectorizes more texts.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from . import instrumentation, predictor
+from .instrumentation import STATS
+from .paths import PREDICTION_CACHE_PATH
+from .predictor import current_model, predict_batch
+from .text import _clean_text
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+@dataclass
+class _Job:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring jobs into one vectorized call."""
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer.")
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self._queue: "queue.Queue[_Job | None]" = queue.Queue()
+        # A job that did not fit in the previous batch starts the next one.
+        self._carry: _Job | None = None
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> "Future[List[Dict[str, float | str]]]":
+        """Queue ``texts`` in jobs of at most ``max_batch_size``; one future for all."""
+        jobs = [
+            _Job(texts=texts[start : start + self.max_batch_size])
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+        for job in jobs:
+            self._queue.put(job)
+        if len(jobs) == 1:
+            return jobs[0].future
+
+        combined: "Future[List[Dict[str, float | str]]]" = Future()
+
+        def finish(_: Future) -> None:
+            # Results are set by the single batcher thread, so callbacks never race.
+            if combined.done() or not all(job.future.done() for job in jobs):
+                return
+            for job in jobs:
+                if job.future.exception() is not None:
+                    combined.set_exception(job.future.exception())
+                    return
+            combined.set_result([record for job in jobs for record in job.future.result()])
+
+        for job in jobs:
+            job.future.add_done_callback(finish)
+        return combined
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Job) -> tuple[List[_Job], bool]:
+        jobs = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                return jobs, True
+            if size + len(job.texts) > self.max_batch_size:
+                self._carry = job
+                break
+            jobs.append(job)
+            size += len(job.texts)
+        return jobs, False
+
+    def _run(self) -> None:
+        while True:
+            first, self._carry = self._carry or self._queue.get(), None
+            if first is None:
+                return
+            jobs, stop = self._collect(first)
+            texts = [text for job in jobs for text in job.texts]
+            if STATS.enabled:
+                STATS.incr("server_micro_batches_total")
+                STATS.incr("server_requests_total", len(jobs))
+            try:
+                records = predict_batch(texts, batch_size=self.max_batch_size).to_records()
+            except Exception as exc:  # surface to every waiting request
+                for job in jobs:
+                    job.future.set_exception(exc)
+            else:
+                offset = 0
+                for job in jobs:
+                    job.future.set_result(records[offset : offset + len(job.texts)])
+                    offset += len(job.texts)
+            if stop:
+                return
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def _make_handler(batcher: MicroBatcher, timeout: float) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: object) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> Dict[str, object]:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object.")
+            return payload
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                version = current_model().version
+                self._send_json(200, {"status": "ok", "model_version": version})
+            elif self.path == "/metrics":
+                body = STATS.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path == "/metrics.json":
+                self._send_json(200, {**STATS.snapshot(), "cache": predictor.cache_stats()})
+            else:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            try:
+                payload = self._read_json()
+                if self.path == "/predict":
+                    texts = [payload.get("text")]
+                elif self.path == "/predict_batch":
+                    texts = payload.get("texts")
+                    if not isinstance(texts, list) or not texts:
+                        raise ValueError("`texts` must be a non-empty list of strings.")
+                else:
+                    self._send_json(404, {"error": f"Unknown path {self.path}"})
+                    return
+                for position, text in enumerate(texts):
+                    if not isinstance(text, str) or not _clean_text(text):
+                        raise ValueError(f"Input text at position {position} cannot be empty.")
+            except ValueError as exc:
+                self._send_json(400, {"error": str(exc)})
+                return
+
+            try:
+                records = batcher.submit(texts).result(timeout=timeout)
+            except Exception as exc:
+                self._send_json(500, {"error": str(exc)})
+                return
+            if self.path == "/predict":
+                self._send_json(200, records[0])
+            else:
+                self._send_json(200, {"predictions": records})
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the AI vs Human detector over HTTP.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=DEFAULT_MAX_BATCH_SIZE,
+        help="Maximum number of texts coalesced into one predict_proba call.",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help="Longest time a request waits for a micro-batch to fill.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Record inference timings and counters, served at /metrics and /metrics.json.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="Enable an in-memory LRU prediction cache with this many entries.",
+    )
+    parser.add_argument(
+        "--cache-db",
+        type=str,
+        nargs="?",
+        const=str(PREDICTION_CACHE_PATH),
+        help="Back the prediction cache with a SQLite file shared across processes.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds a request waits for its scores before returning 500.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.stats:
+        instrumentation.enable()
+    if args.cache_size or args.cache_db:
+        predictor.enable_cache(
+            max_entries=args.cache_size or 10_000, sqlite_path=args.cache_db
+        )
+    current_model()
+    batcher = MicroBatcher(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    server = _Server((args.host, args.port), _make_handler(batcher, args.timeout))
+    print(f"Serving AI vs Human detector on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
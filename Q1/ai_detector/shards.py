@@ -0,0 +1,248 @@
+"""Sharded, multi-source corpus stored as Parquet files plus a manifest.
+
+``ingest`` reads any mix of HC3 splits (``hc3:<split>``, downloaded on demand)
+and our own labeled JSONL/CSV files. It works in two parallel passes:
+
+1. one worker per source streams its records, normalizes them like the
+   processed dataset and appends each row to the bucket of its shard, chosen
+   by a hash of the text;
+2. one worker per shard merges that shard's buckets from every source,
+   drops duplicate texts and writes ``<generation>-shard-NNNNN.parquet``.
+
+Equal texts always hash to the same shard, so deduplication is exact
+without any process holding the whole corpus. ``manifest.json`` is
+replaced atomically after every shard is written and is the only entry
+point for readers; files of older generations are removed afterwards.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import secrets
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import pandas as pd
+
+from .data import _clean_text, _iter_answers, iter_raw_records
+from .fingerprint import file_sha256
+from .paths import RAW_DATA_DIR, SHARDS_DIR, atomic_target, ensure_directories
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARDS = 16
+LABELS = ("ai", "human")
+
+
+def resolve_source(spec: str) -> Tuple[str, Path]:
+    """Map ``hc3:<split>`` or a file path to ``(name, local path)``."""
+    if spec.startswith("hc3:"):
+        split = spec[len("hc3:") :]
+        return spec, RAW_DATA_DIR / f"{split}.jsonl"
+    path = Path(spec)
+    return path.stem, path
+
+
+def iter_source_rows(path: Path) -> Iterator[Tuple[str, str]]:
+    """Yield cleaned ``(text, label)`` rows from an HC3 split or a labeled file.
+
+    JSONL lines with ``human_answers``/``chatgpt_answers`` are flattened like
+    the HC3 builder does; any other line, and every CSV row, must carry
+    ``text`` and an ``ai``/``human`` ``label``.
+    """
+    path = Path(path)
+    records = _iter_csv_records(path) if path.suffix == ".csv" else iter_raw_records(path)
+    for number, record in enumerate(records, start=1):
+        if "human_answers" in record or "chatgpt_answers" in record:
+            yield from _iter_answers([record])
+            continue
+        text = _clean_text(str(record.get("text") or ""))
+        label = str(record.get("label") or "").strip().lower()
+        if label not in LABELS:
+            raise ValueError(f"{path}: record {number} has label {label!r}.")
+        if text:
+            yield text, label
+
+
+def _iter_csv_records(path: Path) -> Iterator[dict]:
+    csv.field_size_limit(sys.maxsize)
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        yield from csv.DictReader(handle)
+
+
+def shard_of(text: str, n_shards: int) -> int:
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % n_shards
+
+
+def _partition_source(
+    index: int, path: Path, staging: Path, n_shards: int
+) -> Dict[str, object]:
+    # Bucket files are opened lazily so a small source does not create N files.
+    handles = {}
+    writers = {}
+    counts = {label: 0 for label in LABELS}
+    try:
+        for text, label in iter_source_rows(path):
+            shard = shard_of(text, n_shards)
+            if shard not in writers:
+                bucket = staging / f"bucket-{shard:05d}-src-{index:04d}.csv"
+                handles[shard] = bucket.open("w", encoding="utf-8", newline="")
+                writers[shard] = csv.writer(handles[shard])
+            writers[shard].writerow((text, label))
+            counts[label] += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return {"rows": sum(counts.values()), "labels": counts, "sha256": file_sha256(path)}
+
+
+def _build_shard(
+    shard: int, staging: Path, output_dir: Path, generation: str, sources: Sequence[str]
+) -> Dict[str, object]:
+    csv.field_size_limit(sys.maxsize)
+    frames = []
+    for index, name in enumerate(sources):
+        bucket = staging / f"bucket-{shard:05d}-src-{index:04d}.csv"
+        if not bucket.exists():
+            continue
+        with bucket.open("r", encoding="utf-8", newline="") as handle:
+            rows = list(csv.reader(handle))
+        frame = pd.DataFrame(rows, columns=["text", "label"])
+        frame["source"] = name
+        frames.append(frame)
+    columns = {"text": [], "label": [], "source": []}
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns)
+    # Source order decides which copy of a duplicated text is kept.
+    df = df.drop_duplicates("text", keep="first").reset_index(drop=True)
+    df["label"] = pd.Categorical(df["label"].astype(str), categories=list(LABELS))
+    df["source"] = df["source"].astype("category")
+    name = f"{generation}-shard-{shard:05d}.parquet"
+    df.to_parquet(output_dir / name, index=False)
+    return {
+        "file": name,
+        "rows": len(df),
+        "labels": {label: int((df["label"] == label).sum()) for label in LABELS},
+    }
+
+
+def ingest(
+    sources: Sequence[str],
+    output_dir: Path = SHARDS_DIR,
+    n_shards: int = DEFAULT_SHARDS,
+    workers: int = 4,
+) -> Dict[str, object]:
+    """Build a new sharded corpus from ``sources`` and return its manifest.
+
+    Missing ``hc3:<split>`` sources are downloaded concurrently first.
+    """
+    if not sources:
+        raise ValueError("At least one source is required.")
+    if n_shards < 1 or workers < 1:
+        raise ValueError("n_shards and workers must be positive integers.")
+    resolved = [resolve_source(spec) for spec in dict.fromkeys(sources)]
+    missing_splits = [
+        name[len("hc3:") :]
+        for name, path in resolved
+        if name.startswith("hc3:") and not path.exists()
+    ]
+    if missing_splits:
+        from .download import download_splits
+
+        download_splits(missing_splits, max_workers=workers)
+    for name, path in resolved:
+        if not path.exists():
+            raise FileNotFoundError(f"Source {name} not found at {path}.")
+
+    output_dir = Path(output_dir)
+    ensure_directories(extra={output_dir})
+    generation = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{secrets.token_hex(3)}"
+    staging = output_dir / f".staging-{generation}"
+    staging.mkdir()
+    names = [name for name, _ in resolved]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            source_stats = list(
+                pool.map(
+                    _partition_source,
+                    range(len(resolved)),
+                    [path for _, path in resolved],
+                    [staging] * len(resolved),
+                    [n_shards] * len(resolved),
+                )
+            )
+            shard_stats = list(
+                pool.map(
+                    _build_shard,
+                    range(n_shards),
+                    [staging] * n_shards,
+                    [output_dir] * n_shards,
+                    [generation] * n_shards,
+                    [names] * n_shards,
+                )
+            )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    total = sum(int(shard["rows"]) for shard in shard_stats)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "generation": generation,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "n_shards": n_shards,
+        "rows": total,
+        "duplicates_dropped": sum(int(stats["rows"]) for stats in source_stats) - total,
+        "labels": {
+            label: sum(int(shard["labels"][label]) for shard in shard_stats) for label in LABELS
+        },
+        "sources": [
+            {"name": name, "path": str(path), **stats}
+            for (name, path), stats in zip(resolved, source_stats)
+        ],
+        "shards": shard_stats,
+    }
+    with atomic_target(output_dir / MANIFEST_NAME) as tmp:
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    current = {shard["file"] for shard in shard_stats}
+    for stale in output_dir.glob("*-shard-*.parquet"):
+        if stale.name not in current:
+            stale.unlink()
+    return manifest
+
+
+def load_manifest(shards_dir: Path = SHARDS_DIR) -> Dict[str, object]:
+    path = Path(shards_dir) / MANIFEST_NAME
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No sharded dataset at {shards_dir}. Run aiot_hw5/Q1/ingest.py first."
+        )
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported shard manifest version at {path}.")
+    return manifest
+
+
+def iter_shards(
+    shards_dir: Path = SHARDS_DIR, columns: Sequence[str] = ("text", "label")
+) -> Iterator[pd.DataFrame]:
+    """Yield the corpus one shard at a time, in manifest order.
+
+    Suitable as the ``chunk_source`` of ``train_detector_streaming``.
+    """
+    manifest = load_manifest(shards_dir)
+    for shard in manifest["shards"]:
+        yield pd.read_parquet(Path(shards_dir) / shard["file"], columns=list(columns))
+
+
+def load_shards(
+    shards_dir: Path = SHARDS_DIR, columns: Sequence[str] = ("text", "label")
+) -> pd.DataFrame:
+    """Concatenate every shard into one DataFrame (for in-memory training)."""
+    frames: List[pd.DataFrame] = list(iter_shards(shards_dir, columns))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,11 @@
+"""Text normalization shared by dataset building and scoring.
+
+Kept free of third-party imports so the scoring path can use it without
+loading pandas.
+"""
+from __future__ import annotations
+
+
+def _clean_text(text: str) -> str:
+    text = (text or "").strip()
+    return " ".join(text.split())
@@ -0,0 +1,139 @@
+"""Cross-validated hyperparameter search over ``build_pipeline`` settings."""
+from __future__ import annotations
+
+import itertools
+import json
+import time
+import tracemalloc
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold
+
+from . import features, neardup
+from .evaluation import DEFAULT_THRESHOLD, metrics_from_counts, threshold_sweep
+from .model import build_pipeline
+
+DEFAULT_GRID: Dict[str, List[object]] = {
+    "ngram_range": [(1, 1), (1, 2)],
+    "min_df": [1, 2],
+    "max_features": [10000, 25000],
+    "C": [0.5, 1.0, 2.0, 4.0],
+}
+
+
+def expand_grid(grid: Dict[str, Iterable[object]]) -> List[Dict[str, object]]:
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _score_fold(
+    params: Dict[str, object],
+    terms: np.ndarray,
+    counts: sp.csr_matrix,
+    y: np.ndarray,
+    train_rows: np.ndarray,
+    test_rows: np.ndarray,
+) -> Dict[str, float]:
+    pipeline = build_pipeline(**params)
+    vectorizer = pipeline.named_steps["tfidf"]
+    classifier = pipeline.named_steps["clf"]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    _, columns = features.fit_vectorizer_from_counts(vectorizer, terms, counts[train_rows])
+    classifier.fit(features.transform_counts(vectorizer, counts[train_rows], columns), y[train_rows])
+    fit_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    test_features = features.transform_counts(vectorizer, counts[test_rows], columns)
+    probabilities = classifier.predict_proba(test_features)
+    score_seconds = time.perf_counter() - started
+
+    ai_probs = probabilities[:, list(classifier.classes_).index("ai")]
+    y_test = y[test_rows]
+    sweep = threshold_sweep(y_test == "ai", ai_probs)
+    return {
+        "accuracy": float(metrics_from_counts(*sweep.counts_at(DEFAULT_THRESHOLD))["accuracy"]),
+        "roc_auc": sweep.roc_auc(),
+        "fit_seconds": fit_seconds,
+        "score_ms_per_doc": 1000.0 * score_seconds / len(test_rows),
+        "peak_fit_mb": peak / 2**20,
+        "n_features": len(columns),
+    }
+
+
+def run_search(
+    dataset: pd.DataFrame,
+    grid: Dict[str, Iterable[object]] | None = None,
+    cv: int = 5,
+    n_jobs: int = -1,
+    random_state: int = 42,
+    group_threshold: float | None = None,
+) -> pd.DataFrame:
+    """Evaluate every grid config with stratified K-fold CV, in parallel.
+
+    Each distinct tokenization setting is counted once over the full dataset;
+    folds then refit vocabulary pruning and idf from their training rows
+    only. Returns one leaderboard row per config sorted by mean ROC-AUC, with
+    mean/std of each fold metric. With ``group_threshold`` the folds keep
+    every near-duplicate group (see ``neardup``) together.
+    """
+    if dataset.empty:
+        raise ValueError("Dataset is empty – build_dataset must provide data.")
+    configs = expand_grid(grid or DEFAULT_GRID)
+    texts = dataset["text"].astype(str).tolist()
+    y = dataset["label"].astype(str).to_numpy()
+    if group_threshold:
+        groups = neardup.group_texts(texts, threshold=group_threshold)
+        fold_of = np.floor(neardup.group_positions(y, groups, random_state) * cv)
+        folds = [
+            (np.flatnonzero(fold_of != fold), np.flatnonzero(fold_of == fold))
+            for fold in range(cv)
+        ]
+    else:
+        folds = list(
+            StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(texts, y)
+        )
+
+    # Configs that only differ in pruning or classifier settings share one
+    # count matrix, so each tokenization is done once for all of them.
+    matrices: Dict[str, tuple] = {}
+    config_matrix: List[str] = []
+    for config in configs:
+        vectorizer = build_pipeline(**config).named_steps["tfidf"]
+        key = json.dumps(features.analyzer_params(vectorizer), sort_keys=True, default=list)
+        if key not in matrices:
+            matrices[key] = features.load_or_build_counts(texts, vectorizer)
+        config_matrix.append(key)
+
+    tasks = [(index, fold) for index in range(len(configs)) for fold in range(len(folds))]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(configs[index], *matrices[config_matrix[index]], y, *folds[fold])
+        for index, fold in tasks
+    )
+
+    rows = []
+    for index, config in enumerate(configs):
+        fold_results = pd.DataFrame(
+            [result for (task_index, _), result in zip(tasks, results) if task_index == index]
+        )
+        row = dict(config)
+        for metric in ("accuracy", "roc_auc"):
+            row[f"{metric}_mean"] = round(float(fold_results[metric].mean()), 4)
+            row[f"{metric}_std"] = round(float(fold_results[metric].std(ddof=0)), 4)
+        row["fit_seconds"] = round(float(fold_results["fit_seconds"].mean()), 4)
+        row["score_ms_per_doc"] = round(float(fold_results["score_ms_per_doc"].mean()), 4)
+        row["peak_fit_mb"] = round(float(fold_results["peak_fit_mb"].max()), 1)
+        row["n_features"] = int(fold_results["n_features"].mean())
+        rows.append(row)
+
+    leaderboard = pd.DataFrame(rows).sort_values(
+        ["roc_auc_mean", "accuracy_mean", "fit_seconds"], ascending=[False, False, True]
+    )
+    return leaderboard.reset_index(drop=True)
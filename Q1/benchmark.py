@@ -0,0 +1,156 @@
+"""Benchmark entry-point for the AI vs Human detector."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+
+from ai_detector import bench, data
+from ai_detector.paths import (
+    BENCHMARK_BASELINE_PATH,
+    BENCHMARK_RESULTS_PATH,
+    ensure_directories,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark dataset build, training, cold start and inference"
+    )
+    parser.add_argument(
+        "--build-factor",
+        type=int,
+        default=4,
+        help="Replicate the raw HC3 split this many times for the dataset build timing.",
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=10_000,
+        help="Number of (replicated) documents for the vectorize/fit timing.",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1_000, 10_000],
+        help="Batch sizes for the predict_batch throughput timing.",
+    )
+    parser.add_argument(
+        "--latency-samples",
+        type=int,
+        default=300,
+        help="Number of predict_text calls for the p50/p99 latency.",
+    )
+    parser.add_argument(
+        "--eval-rows",
+        type=int,
+        default=100_000,
+        help="Synthetic holdout size for the threshold sweep and bootstrap timing.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=BENCHMARK_RESULTS_PATH,
+        help="Where to write the JSON results.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BENCHMARK_BASELINE_PATH,
+        help="Baseline JSON to compare against.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown beyond which a metric is flagged as a regression.",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store these results as the new baseline.",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help=(
+            "Exit with status 1 when any metric regresses, the import budget is exceeded "
+            "or there is no baseline to compare against (unless --update-baseline)."
+        ),
+    )
+    parser.add_argument(
+        "--check-imports",
+        action="store_true",
+        help=(
+            "Only check that importing the scoring path stays within --import-budget-ms "
+            "and loads no training dependencies; exit with status 1 otherwise."
+        ),
+    )
+    parser.add_argument(
+        "--import-budget-ms",
+        type=float,
+        default=bench.SCORING_IMPORT_BUDGET_MS,
+        help="Largest acceptable import time of ai_detector.predictor.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    import_check = bench.check_import_budget(budget_ms=args.import_budget_ms)
+    if args.check_imports:
+        print(json.dumps(import_check, indent=2))
+        sys.exit(1 if import_check["violations"] else 0)
+
+    dataset = data.load_dataset()
+    results = bench.run_benchmarks(
+        dataset,
+        build_factor=args.build_factor,
+        train_size=args.train_size,
+        batch_sizes=args.batch_sizes,
+        latency_samples=args.latency_samples,
+        eval_rows=args.eval_rows,
+    )
+
+    regressions = []
+    baseline_found = args.baseline.exists()
+    if baseline_found:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = bench.compare_to_baseline(
+            results, baseline.get("results", {}), tolerance=args.tolerance
+        )
+    else:
+        print(
+            f"warning: no baseline at {args.baseline}; regressions were not checked "
+            "(run with --update-baseline to create it).",
+            file=sys.stderr,
+        )
+    payload = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+        "baseline_found": baseline_found,
+        "regressions": regressions,
+        "import_check": import_check,
+    }
+    ensure_directories(extra={args.output.parent})
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(json.dumps(payload, indent=2))
+    missing_baseline = not baseline_found and not args.update_baseline
+    if args.fail_on_regression and (
+        regressions or import_check["violations"] or missing_baseline
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Corpus ingestion entry-point: build the sharded multi-source dataset."""
+from __future__ import annotations
+
+import argparse
+import json
+
+from ai_detector import shards
+from ai_detector.paths import HC3_SPLITS, SHARDS_DIR
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Ingest HC3 splits and labeled files into a sharded Parquet dataset"
+    )
+    parser.add_argument(
+        "--hc3",
+        nargs="*",
+        default=["open_qa"],
+        help=(
+            "HC3 splits to include, downloaded if missing "
+            f"(available: {', '.join(HC3_SPLITS)})."
+        ),
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        action="append",
+        default=[],
+        help=(
+            "Extra labeled JSONL/CSV file with text and label (ai/human) fields. "
+            "Repeat for several files; earlier sources win on duplicate texts."
+        ),
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=shards.DEFAULT_SHARDS,
+        help="Number of shards; rows are assigned by a hash of their text.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Parallel processes for reading sources and writing shards.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(SHARDS_DIR),
+        help="Directory that receives the shards and manifest.json.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    sources = [f"hc3:{split}" for split in args.hc3] + args.source
+    manifest = shards.ingest(
+        sources, output_dir=args.output, n_shards=args.shards, workers=args.workers
+    )
+    summary = {key: value for key, value in manifest.items() if key != "shards"}
+    summary["output"] = args.output
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
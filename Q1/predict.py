@@ -4,8 +4,19 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from contextlib import ExitStack
+from typing import Dict, List
 
-from ai_detector.predictor import predict_text
+from ai_detector import predictor
+from ai_detector.paths import PREDICTION_CACHE_PATH
+from ai_detector.predictor import DEFAULT_BATCH_SIZE, predict_batch
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
@@ -13,23 +24,256 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--text",
         type=str,
-        help="Text to evaluate. If omitted, the script reads from STDIN.",
+        action="append",
+        help=(
+            "Text to evaluate. Repeat to score several texts in one batch. "
+            "If omitted, the script reads from STDIN. One text prints a JSON object, "
+            "several print a JSON list."
+        ),
+    )
+    parser.add_argument(
+        "--as-list",
+        action="store_true",
+        help="Always print a JSON list, even for a single text.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of texts vectorized per predict_proba call.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of scoring processes; each maps the model artifact read-only.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Record per-stage timings and counters and print them to STDERR at exit.",
+    )
+    parser.add_argument(
+        "--stats-format",
+        choices=("json", "prometheus"),
+        default="json",
+        help="Output format for --stats.",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help=(
+            "Include the n-grams that contributed most to each score "
+            "(TF-IDF weight x coefficient, signed towards AI). Scores in this process "
+            "without the prediction cache, so it cannot be combined with --workers or "
+            "--cache/--cache-db, and needs a model trained without --streaming."
+        ),
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=10,
+        help="Number of n-grams listed per text with --explain.",
+    )
+    long = parser.add_argument_group("long-document mode")
+    long.add_argument(
+        "--long",
+        action="store_true",
+        help=(
+            "Score each text as overlapping word windows and report the aggregated "
+            "document score together with every window's score and character span."
+        ),
+    )
+    long.add_argument(
+        "--window-words",
+        type=_positive_int,
+        default=200,
+        help="Words per window in --long mode.",
+    )
+    long.add_argument(
+        "--stride-words",
+        type=_positive_int,
+        help="Words between window starts in --long mode (default: half a window).",
+    )
+    long.add_argument(
+        "--aggregate",
+        choices=("mean", "max"),
+        default="mean",
+        help="How window scores combine into the document score in --long mode.",
+    )
+    cache = parser.add_argument_group("prediction cache")
+    cache.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse scores for repeated (whitespace-normalized) texts within this run.",
+    )
+    cache.add_argument(
+        "--cache-db",
+        type=str,
+        nargs="?",
+        const=str(PREDICTION_CACHE_PATH),
+        help=(
+            "Also persist scores in a SQLite file shared across runs "
+            f"(default when given without a path: {PREDICTION_CACHE_PATH})."
+        ),
+    )
+    cache.add_argument(
+        "--cache-size",
+        type=int,
+        default=10_000,
+        help="Maximum entries in the in-memory LRU tier.",
+    )
+    bulk = parser.add_argument_group("bulk mode")
+    bulk.add_argument(
+        "--input",
+        type=str,
+        help="JSONL/CSV file of records to score, or '-' for STDIN. Enables bulk mode.",
+    )
+    bulk.add_argument(
+        "--input-format",
+        choices=("jsonl", "csv"),
+        help="Input record format (default: inferred from --input extension, else jsonl).",
+    )
+    bulk.add_argument(
+        "--output",
+        type=str,
+        default="-",
+        help="Destination for scored records (default: STDOUT).",
+    )
+    bulk.add_argument(
+        "--output-format",
+        choices=("jsonl", "csv"),
+        help="Output record format (default: inferred from --output extension, else jsonl).",
+    )
+    bulk.add_argument(
+        "--output-fields",
+        type=str,
+        help=(
+            "Comma-separated input fields to keep as CSV columns, before the score columns "
+            "(default: the fields of the first record). A record with any other field "
+            "stops the run with an error instead of dropping it."
+        ),
+    )
+    bulk.add_argument(
+        "--text-field",
+        type=str,
+        default="text",
+        help="Record field that holds the text to score.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.input and (args.explain or args.long):
+        parser.error("--explain and --long are not supported in bulk mode (--input).")
+    if args.input and args.as_list:
+        parser.error("--as-list does not apply to bulk mode (--input).")
+    if args.long and args.workers > 1:
+        parser.error("--long scores in this process and cannot be used with --workers.")
+    if args.stride_words and args.stride_words > args.window_words:
+        parser.error("--stride-words cannot exceed --window-words.")
+    if args.explain and args.workers > 1:
+        parser.error("--explain scores in this process and cannot be used with --workers.")
+    if args.explain and (args.cache or args.cache_db):
+        parser.error("--explain bypasses the prediction cache; drop --cache/--cache-db.")
+    return args
+
+
+def run_bulk(args: argparse.Namespace) -> None:
+    from ai_detector import bulk
+
+    input_format = args.input_format or bulk.infer_format(args.input)
+    output_format = args.output_format or bulk.infer_format(args.output)
+    stats = bulk.BulkStats()
+    with ExitStack() as stack:
+        source = (
+            sys.stdin
+            if args.input == "-"
+            else stack.enter_context(open(args.input, "r", encoding="utf-8", newline=""))
+        )
+        sink = (
+            sys.stdout
+            if args.output == "-"
+            else stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+        )
+        fieldnames = args.output_fields.split(",") if args.output_fields else None
+        writer = bulk.RecordWriter(sink, output_format, fieldnames=fieldnames)
+        records = bulk.iter_records(source, input_format)
+        for row in bulk.score_records(
+            records,
+            text_field=args.text_field,
+            chunk_size=args.batch_size,
+            stats=stats,
+            n_jobs=args.workers,
+        ):
+            writer.write(row)
+    print(json.dumps(stats.summary()), file=sys.stderr)
+
+
+def print_stats(stats_format: str) -> None:
+    from ai_detector.instrumentation import STATS
+
+    if stats_format == "prometheus":
+        sys.stderr.write(STATS.to_prometheus())
+    else:
+        print(json.dumps(STATS.snapshot(), indent=2), file=sys.stderr)
 
 
 def main() -> None:
     args = parse_args()
+    if args.stats:
+        from ai_detector import instrumentation
+
+        instrumentation.enable()
+    if args.cache or args.cache_db:
+        predictor.enable_cache(max_entries=args.cache_size, sqlite_path=args.cache_db)
+    try:
+        run(args)
+    except ValueError as exc:
+        raise SystemExit(f"error: {exc}")
+    finally:
+        if args.stats:
+            print_stats(args.stats_format)
+        if args.cache or args.cache_db:
+            print(json.dumps({"cache": predictor.cache_stats()}), file=sys.stderr)
+            predictor.disable_cache()
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.input:
+        run_bulk(args)
+        return
     if args.text:
-        text = args.text
+        texts = args.text
     else:
-        text = sys.stdin.read().strip()
-    if not text:
+        texts = [sys.stdin.read().strip()]
+    if not all(text.strip() for text in texts):
         raise SystemExit("No text was provided for prediction.")
-    result = predict_text(text)
-    print(json.dumps(result, indent=2))
+    if args.long:
+        from ai_detector.longdoc import predict_long_text
+
+        records = [
+            predict_long_text(
+                text,
+                window_words=args.window_words,
+                stride_words=args.stride_words,
+                aggregate=args.aggregate,
+                batch_size=args.batch_size,
+            ).to_record()
+            for text in texts
+        ]
+        print_records(records, args.as_list)
+        return
+    records = predict_batch(
+        texts,
+        batch_size=args.batch_size,
+        n_jobs=args.workers,
+        explain=args.explain,
+        top_k=args.top_k,
+    ).to_records()
+    print_records(records, args.as_list)
+
+
+def print_records(records: List[Dict[str, object]], as_list: bool) -> None:
+    print(json.dumps(records if as_list or len(records) > 1 else records[0], indent=2))
 
 
 if __name__ == "__main__":
     main()
-
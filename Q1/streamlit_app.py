@@ -1,14 +1,21 @@
 """Streamlit UI for the AI vs Human detector."""
 from __future__ import annotations
 
+import html
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List
 
 import pandas as pd
 import streamlit as st
 
-from ai_detector.paths import METRICS_PATH, MODEL_PATH, SAMPLES_PATH
-from ai_detector.predictor import load_metrics, predict_text
+from ai_detector import bulk, instrumentation, predictor
+from ai_detector.cache import PredictionCache
+from ai_detector.paths import METRICS_PATH, MODEL_PATH, REGISTRY_CURRENT_PATH, SAMPLES_PATH
+from ai_detector.longdoc import LongDocumentPrediction, predict_long_text
+from ai_detector.predictor import load_metrics, predict_batch, predict_text
 
 st.set_page_config(
     page_title="AI vs Human Detector",
@@ -22,12 +29,90 @@ st.caption(
     " 模型使用 HC3 open_qa 資料集並以 TF-IDF + Logistic Regression 訓練而成。"
 )
 
-model_ready = Path(MODEL_PATH).exists()
+
+def render_segments(long_result: LongDocumentPrediction) -> str:
+    """Shade each span of the text by its AI probability."""
+    text = long_result.text
+    parts = []
+    cursor = 0
+    for start, end, score in long_result.segments():
+        # Spans below the operating threshold stay unshaded.
+        cutoff = long_result.threshold
+        alpha = max(0.0, score - cutoff) / max(1.0 - cutoff, 1e-6) * 0.6
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(
+            f'<span style="background-color: rgba(255, 75, 75, {alpha:.2f})" '
+            f'title="AI {score:.1%}">{html.escape(text[start:end])}</span>'
+        )
+        cursor = end
+    parts.append(html.escape(text[cursor:]))
+    return '<div style="white-space: pre-wrap">' + "".join(parts) + "</div>"
+
+
+def _mtime_ns(path: Path) -> int:
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+# Everything below is shared by all sessions of this server process. The
+# report loaders are keyed on artifact mtimes, so a retrain invalidates them
+# while ordinary reruns hit the cache. The model is not cached here: the
+# scoring helpers use predictor.current_model(), which already holds one
+# model per process and hot-reloads it when the registry changes.
+@st.cache_resource
+def prediction_cache() -> PredictionCache:
+    return predictor.enable_cache(max_entries=10_000)
+
+
+@st.cache_resource
+def scoring_pool() -> ThreadPoolExecutor:
+    # A small shared pool bounds how many uploads are scored at once.
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-scoring")
+
+
+@st.cache_data
+def load_cached_metrics(metrics_mtime: int) -> Dict[str, object]:
+    return load_metrics()
+
+
+@dataclass
+class ScoringJob:
+    """An uploaded file being scored in ``scoring_pool``; read by the UI thread."""
+
+    total: int
+    stats: bulk.BulkStats = field(default_factory=bulk.BulkStats)
+    rows: List[Dict[str, object]] = field(default_factory=list)
+    future: Future | None = None
+    summary: Dict[str, float] | None = None
+
+    @property
+    def processed(self) -> int:
+        return self.stats.documents + self.stats.skipped
+
+
+def _score_upload(job: ScoringJob, records: List[Dict[str, object]], text_field: str) -> None:
+    rows = bulk.score_records(records, text_field=text_field, chunk_size=512, stats=job.stats)
+    for row in rows:
+        job.rows.append(row)
+    job.summary = job.stats.summary()
+
+
+def read_upload(uploaded) -> pd.DataFrame:
+    """CSV keeps its columns; TXT becomes one ``text`` row per non-empty line."""
+    if uploaded.name.lower().endswith(".csv"):
+        return pd.read_csv(uploaded, dtype=str, keep_default_na=False)
+    lines = uploaded.getvalue().decode("utf-8", errors="replace").splitlines()
+    return pd.DataFrame({"text": [line.strip() for line in lines if line.strip()]})
+
+
+model_ready = REGISTRY_CURRENT_PATH.exists() or Path(MODEL_PATH).exists()
+prediction_cache()
 if not model_ready:
     st.error(
         "找不到模型檔案。請先在本機執行 `python3 aiot_hw5/Q1/train.py` 產生模型與報表。"
     )
     st.stop()
+with st.spinner("載入模型中…"):
+    served_model = predictor.current_model()
 
 with st.container():
     st.subheader("Step 1 — 貼上要檢測的文章")
@@ -41,11 +126,23 @@ with st.container():
         height=200,
         help="支援中英文或混合內容，建議至少 2 句以上能更準確。",
     )
+    long_mode = st.toggle(
+        "長文件模式（滑動視窗）",
+        help="將長文切成重疊的字詞視窗一次批次評分，並標示 AI 機率較高的段落。",
+    )
+    explain = st.toggle(
+        "顯示判斷依據",
+        help="列出對結果影響最大的詞組（TF-IDF 權重 × 模型係數），正值代表偏向 AI。",
+    )
     analyze = st.button("分析這段文字", type="primary", use_container_width=True)
 
     if analyze:
         try:
-            result = predict_text(text)
+            if long_mode:
+                long_result = predict_long_text(text)
+                result = long_result.to_record()
+            else:
+                result = predict_text(text, explain=explain)
         except ValueError as exc:
             st.warning(str(exc))
         else:
@@ -58,12 +155,103 @@ with st.container():
             cols[1].progress(
                 min(max(human_pct / 100, 0.0), 1.0), text=f"Human: {human_pct:.2f}%"
             )
+            if long_mode:
+                st.caption(
+                    f"共 {len(long_result.windows)} 個視窗；底色越紅代表該段 AI 機率越高。"
+                )
+                st.markdown(render_segments(long_result), unsafe_allow_html=True)
+            if "explanation" in result:
+                st.dataframe(
+                    pd.DataFrame(result.pop("explanation")),
+                    use_container_width=True,
+                    hide_index=True,
+                )
             st.json(result, expanded=False)
 
+    with st.expander("一次檢測多段文字（批次模式）", expanded=False):
+        batch_text = st.text_area(
+            "每段文字之間以空白行分隔",
+            height=200,
+            key="batch_text",
+        )
+        analyze_batch = st.button("批次分析", use_container_width=True)
+        if analyze_batch:
+            paragraphs = [part.strip() for part in batch_text.split("\n\n") if part.strip()]
+            if not paragraphs:
+                st.warning("請至少輸入一段文字。")
+            else:
+                batch = predict_batch(paragraphs)
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "text": paragraphs,
+                            "label": batch.labels,
+                            "ai_probability": batch.ai_probability,
+                            "human_probability": batch.human_probability,
+                        }
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+
+    with st.expander("上傳檔案批次評分（CSV / TXT）", expanded=False):
+        uploaded = st.file_uploader(
+            "CSV 需含文字欄位；TXT 每一行視為一筆",
+            type=["csv", "txt"],
+        )
+        if uploaded is not None:
+            upload_df = read_upload(uploaded)
+            columns = list(upload_df.columns)
+            text_field = st.selectbox(
+                "文字欄位",
+                columns,
+                index=columns.index("text") if "text" in columns else 0,
+            )
+            st.caption(f"共 {len(upload_df)} 筆")
+            if st.button("開始評分", use_container_width=True, disabled=upload_df.empty):
+                job = ScoringJob(total=len(upload_df))
+                job.future = scoring_pool().submit(
+                    _score_upload, job, upload_df.to_dict("records"), text_field
+                )
+                st.session_state["upload_job"] = job
+
+        job = st.session_state.get("upload_job")
+        if job is not None and not job.future.done():
+            # Only this fragment reruns while the worker is busy; the rest of
+            # the page stays as it is until the job finishes.
+            @st.fragment(run_every=0.5)
+            def upload_progress() -> None:
+                if job.future.done():
+                    st.rerun()
+                st.progress(
+                    job.processed / job.total if job.total else 1.0,
+                    text=f"評分中… {job.processed}/{job.total}",
+                )
+
+            upload_progress()
+        elif job is not None:
+            if job.future.exception() is not None:
+                st.error(f"評分失敗：{job.future.exception()}")
+            else:
+                results = pd.DataFrame(job.rows)
+                summary = job.summary
+                st.success(
+                    f"完成 {summary['documents']} 筆（略過空白 {summary['skipped']} 筆），"
+                    f"{summary['docs_per_second']} 筆/秒"
+                )
+                st.dataframe(results.head(200), use_container_width=True, hide_index=True)
+                st.download_button(
+                    "下載結果 CSV",
+                    data=results.to_csv(index=False).encode("utf-8"),
+                    file_name="predictions.csv",
+                    mime="text/csv",
+                    use_container_width=True,
+                )
+
 st.divider()
 st.subheader("Step 2 — 模型與資料統計")
 
-metrics_payload = load_metrics()
+metrics_payload = load_cached_metrics(_mtime_ns(METRICS_PATH))
 if metrics_payload:
     summary = metrics_payload.get("summary", {})
     cols = st.columns(len(summary) or 1)
@@ -74,7 +262,7 @@ else:
 
 
 @st.cache_data
-def load_samples(limit: int = 5) -> pd.DataFrame | None:
+def load_samples(samples_mtime: int, limit: int = 5) -> pd.DataFrame | None:
     path = Path(SAMPLES_PATH)
     if not path.exists():
         return None
@@ -82,12 +270,33 @@ def load_samples(limit: int = 5) -> pd.DataFrame | None:
     return df.head(limit)
 
 
-samples_df = load_samples()
+samples_df = load_samples(_mtime_ns(SAMPLES_PATH))
 if samples_df is not None and not samples_df.empty:
     st.dataframe(samples_df, use_container_width=True, hide_index=True)
 else:
     st.info("尚未生成 sample_predictions.csv。")
 
+with st.sidebar:
+    st.subheader("推論效能統計")
+    stats_on = st.toggle(
+        "啟用計時與計數（全域）",
+        value=instrumentation.STATS.enabled,
+        help=(
+            "記錄文字清理、TF-IDF 轉換與 LR 評分各階段耗時；關閉時幾乎沒有額外負擔。"
+            "此開關與統計數據由整個伺服器程序共用，會影響所有使用者的 session。"
+        ),
+    )
+    if stats_on:
+        instrumentation.enable()
+    else:
+        instrumentation.disable()
+    if st.button("重設統計（全域）", use_container_width=True):
+        instrumentation.STATS.reset()
+    st.json(instrumentation.STATS.snapshot(), expanded=False)
+    st.caption(f"模型版本：{served_model.version or MODEL_PATH.name}")
+    st.caption("預測快取（重複文字直接回傳，不再重新計算）")
+    st.json(predictor.cache_stats(), expanded=False)
+
 st.divider()
 with st.expander("如何部署到 Streamlit Cloud？", expanded=False):
     st.markdown(
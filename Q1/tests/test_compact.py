@@ -0,0 +1,36 @@
+"""``CompactScorer`` must score exactly like the pipeline it was exported from."""
+from __future__ import annotations
+
+import numpy as np
+
+from ai_detector.compact import CompactScorer, export_compact
+from ai_detector.model import build_pipeline
+
+TRAIN_TEXTS = [
+    "the model writes in a smooth and balanced tone",
+    "honestly i just wrote this on my phone lol",
+    "in conclusion the findings demonstrate a robust framework",
+    "we went to the beach and the dog ate my sandwich",
+    "furthermore this approach leverages comprehensive insights",
+    "my cousin fixed the bike but the brakes still squeak",
+]
+TRAIN_LABELS = ["ai", "human", "ai", "human", "ai", "human"]
+
+
+def _fit_and_export(tmp_path):
+    pipeline = build_pipeline(min_df=1).fit(TRAIN_TEXTS, TRAIN_LABELS)
+    export_compact(pipeline, path=tmp_path, source=tmp_path / "missing.joblib")
+    return pipeline, CompactScorer(tmp_path)
+
+
+def test_matches_pipeline(tmp_path):
+    pipeline, scorer = _fit_and_export(tmp_path)
+    texts = TRAIN_TEXTS + ["", "a comprehensive beach framework"]
+    np.testing.assert_allclose(scorer.predict_proba(texts), pipeline.predict_proba(texts))
+
+
+def test_long_token_does_not_widen_candidates(tmp_path):
+    pipeline, scorer = _fit_and_export(tmp_path)
+    blob = "x" * 200_000
+    texts = [f"the findings demonstrate {blob} a robust framework"] + TRAIN_TEXTS * 200
+    np.testing.assert_allclose(scorer.predict_proba(texts), pipeline.predict_proba(texts))
@@ -3,9 +3,12 @@ from __future__ import annotations
 
 import argparse
 import json
+from functools import partial
 from pathlib import Path
 
-from ai_detector import data, model
+from ai_detector import compact, data, model, neardup, registry, shards
+from ai_detector.evaluation import OBJECTIVES
+from ai_detector.paths import SHARDS_DIR
 
 
 def parse_args() -> argparse.Namespace:
@@ -33,6 +36,78 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Re-download the HC3 dataset even if a cached copy exists.",
     )
+    parser.add_argument(
+        "--feature-cache",
+        action="store_true",
+        help=(
+            "Reuse a cached n-gram count matrix for this dataset and analyzer settings "
+            "so runs that only change the split or classifier skip tokenization."
+        ),
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "Train out-of-core with a HashingVectorizer + SGD classifier fed from "
+            "chunked reads of the processed dataset."
+        ),
+    )
+    parser.add_argument(
+        "--shards",
+        type=str,
+        nargs="?",
+        const=str(SHARDS_DIR),
+        help=(
+            "Train on the sharded dataset built by ingest.py instead of the processed CSV "
+            f"(default when given without a path: {SHARDS_DIR}). With --streaming the "
+            "shards are read one at a time."
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=10_000,
+        help="Rows per chunk in --streaming mode.",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=3,
+        help="Passes over the dataset in --streaming mode.",
+    )
+    parser.add_argument(
+        "--threshold-objective",
+        choices=OBJECTIVES,
+        default="f1",
+        help=(
+            "How the operating threshold is chosen on the test split; predictions use "
+            "it from then on. 'fixed' keeps 0.5."
+        ),
+    )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=1000,
+        help="Bootstrap resamples for the metric confidence intervals (0 to skip).",
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=neardup.DEFAULT_THRESHOLD,
+        help=(
+            "Estimated Jaccard similarity at which texts count as near-duplicates; "
+            "such groups stay on one side of the train/test split (0 disables). "
+            "Ignored by --streaming."
+        ),
+    )
+    parser.add_argument(
+        "--rebuild-dataset",
+        action="store_true",
+        help=(
+            "Rebuild the processed CSV from the raw dump first, dropping near-duplicates "
+            "at --near-dup-threshold."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -40,21 +115,79 @@ def main() -> None:
     args = parse_args()
     if args.force_download:
         data.download_raw_dataset(force=True)
-    dataset = data.load_dataset(limit_per_label=args.limit_per_label)
-    training_report = model.train_detector(
-        dataset, test_size=args.test_size, random_state=args.random_state
-    )
+    if args.rebuild_dataset:
+        data.build_dataset(
+            limit_per_label=args.limit_per_label,
+            near_dup_threshold=args.near_dup_threshold or None,
+        )
+    if args.streaming:
+        if args.shards:
+            chunk_source = partial(shards.iter_shards, args.shards)
+        else:
+            chunk_source = partial(
+                data.iter_dataset_chunks,
+                chunksize=args.chunksize,
+                limit_per_label=args.limit_per_label,
+            )
+        training_report = model.train_detector_streaming(
+            chunk_source,
+            test_size=args.test_size,
+            random_state=args.random_state,
+            epochs=args.epochs,
+            threshold_objective=args.threshold_objective,
+            bootstrap_resamples=args.bootstrap_resamples,
+        )
+    else:
+        if args.shards:
+            dataset = shards.load_shards(args.shards)
+        else:
+            dataset = data.load_dataset(limit_per_label=args.limit_per_label)
+        training_report = model.train_detector(
+            dataset,
+            test_size=args.test_size,
+            random_state=args.random_state,
+            use_feature_cache=args.feature_cache,
+            threshold_objective=args.threshold_objective,
+            bootstrap_resamples=args.bootstrap_resamples,
+            group_threshold=args.near_dup_threshold or None,
+        )
     model_path = model.save_model(training_report.pipeline)
+    model.save_operating_point(
+        training_report.threshold, args.threshold_objective, model_path=model_path
+    )
+    compact_path = None
+    if not args.streaming:
+        compact_path = compact.export_compact(
+            training_report.pipeline, source=Path(model_path)
+        )
     metrics_path = model.save_metrics(
         training_report.metrics, training_report.classification_report
     )
+    evaluation_path = model.save_evaluation(training_report.evaluation)
     samples_path = model.save_samples(training_report.samples)
+    version = registry.publish(
+        training_report.pipeline,
+        training_report.metrics,
+        params={
+            "limit_per_label": args.limit_per_label,
+            "streaming": args.streaming,
+            "threshold_objective": args.threshold_objective,
+            "near_dup_threshold": args.near_dup_threshold,
+        },
+        threshold=training_report.threshold,
+    )
 
     summary = {
+        "model_version": version,
         "model_path": model_path,
+        "compact_model_path": compact_path,
         "metrics_path": metrics_path,
+        "evaluation_path": evaluation_path,
         "samples_preview": samples_path,
         "metrics": training_report.metrics,
+        "confidence_intervals": training_report.evaluation.get("bootstrap", {}).get(
+            "intervals"
+        ),
     }
     print(json.dumps(summary, indent=2))
 
@@ -0,0 +1,123 @@
+"""Hyperparameter search entry-point for the AI vs Human detector."""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from ai_detector import compact, data, model, neardup, registry, tuning
+from ai_detector.evaluation import OBJECTIVES
+from ai_detector.paths import TUNING_LEADERBOARD_PATH, ensure_directories
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cross-validated parallel search over detector pipeline settings"
+    )
+    parser.add_argument(
+        "--limit-per-label",
+        type=int,
+        default=4000,
+        help="Maximum number of samples to keep for each class (ai/human).",
+    )
+    parser.add_argument("--cv", type=int, default=5, help="Number of stratified folds.")
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=-1,
+        help="Parallel fold fits (-1 uses every core).",
+    )
+    parser.add_argument(
+        "--random-state",
+        type=int,
+        default=42,
+        help="Random seed for fold assignment and the promotion split.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of leaderboard rows to print.",
+    )
+    parser.add_argument(
+        "--promote",
+        action="store_true",
+        help="Retrain the best config and overwrite the model artifact and reports.",
+    )
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=0.25,
+        help="Holdout ratio used when retraining the promoted config.",
+    )
+    parser.add_argument(
+        "--threshold-objective",
+        choices=OBJECTIVES,
+        default="f1",
+        help="How the promoted model's operating threshold is chosen on the holdout.",
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=neardup.DEFAULT_THRESHOLD,
+        help=(
+            "Keep near-duplicate groups inside one fold and on one side of the promotion "
+            "split (0 disables)."
+        ),
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    dataset = data.load_dataset(limit_per_label=args.limit_per_label)
+    group_threshold = args.near_dup_threshold or None
+    leaderboard = tuning.run_search(
+        dataset,
+        cv=args.cv,
+        n_jobs=args.n_jobs,
+        random_state=args.random_state,
+        group_threshold=group_threshold,
+    )
+    ensure_directories(extra={TUNING_LEADERBOARD_PATH.parent})
+    leaderboard.to_csv(TUNING_LEADERBOARD_PATH, index=False)
+
+    summary = {
+        "leaderboard_path": str(TUNING_LEADERBOARD_PATH),
+        "top": json.loads(leaderboard.head(args.top).to_json(orient="records")),
+    }
+    if args.promote:
+        best = {name: leaderboard.iloc[0][name] for name in tuning.DEFAULT_GRID}
+        training_report = model.train_detector(
+            dataset,
+            test_size=args.test_size,
+            random_state=args.random_state,
+            use_feature_cache=True,
+            pipeline_params=best,
+            threshold_objective=args.threshold_objective,
+            group_threshold=group_threshold,
+        )
+        model_path = model.save_model(training_report.pipeline)
+        model.save_operating_point(
+            training_report.threshold, args.threshold_objective, model_path=model_path
+        )
+        compact.export_compact(training_report.pipeline, source=Path(model_path))
+        model.save_metrics(training_report.metrics, training_report.classification_report)
+        model.save_evaluation(training_report.evaluation)
+        model.save_samples(training_report.samples)
+        version = registry.publish(
+            training_report.pipeline,
+            training_report.metrics,
+            params=best,
+            threshold=training_report.threshold,
+        )
+        summary["promoted"] = {
+            "model_version": version,
+            "model_path": model_path,
+            "metrics": training_report.metrics,
+        }
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
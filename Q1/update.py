@@ -0,0 +1,164 @@
+"""Incremental update entry-point: fold newly labeled texts into the current model."""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from ai_detector import compact, data, model, neardup, registry
+from ai_detector.evaluation import OBJECTIVES
+
+GATED_METRICS = ("accuracy", "roc_auc")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Warm-start the current detector on new labeled data and promote it "
+        "only if holdout metrics do not regress"
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        required=True,
+        help='JSONL file of newly labeled records: {"text": ..., "label": "ai"|"human"}.',
+    )
+    parser.add_argument(
+        "--limit-per-label",
+        type=int,
+        default=4000,
+        help="Maximum number of base samples to keep for each class (ai/human).",
+    )
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=0.25,
+        help="Holdout ratio used the first time the fixed holdout is created.",
+    )
+    parser.add_argument(
+        "--random-state",
+        type=int,
+        default=42,
+        help="Random seed used the first time the fixed holdout is created.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="Largest drop in holdout accuracy or ROC-AUC that still allows promotion.",
+    )
+    parser.add_argument(
+        "--max-iter",
+        type=int,
+        default=200,
+        help="lbfgs iterations for the warm-started logistic regression.",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=3,
+        help="partial_fit passes over the new rows for --streaming (SGD) models.",
+    )
+    parser.add_argument(
+        "--threshold-objective",
+        choices=OBJECTIVES,
+        default="f1",
+        help="How the candidate's operating threshold is chosen on the holdout.",
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=neardup.DEFAULT_THRESHOLD,
+        help=(
+            "Near-duplicate grouping used the first time the fixed holdout is created "
+            "(0 disables)."
+        ),
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    added = data.read_labeled(Path(args.input))
+    summary = {"added_rows": len(added)}
+    if added.empty:
+        summary["promoted"] = False
+        summary["reason"] = "no new labeled texts"
+        print(json.dumps(summary, indent=2))
+        return
+
+    dataset = data.load_dataset(limit_per_label=args.limit_per_label)
+    holdout = model.fixed_holdout(
+        dataset,
+        test_size=args.test_size,
+        random_state=args.random_state,
+        group_threshold=args.near_dup_threshold or None,
+    )
+    # Nothing in the holdout may be trained on, including relabeled copies
+    # that arrive through the additions store.
+    held_out = set(holdout["text"])
+    earlier = data.load_labeled_additions()
+    train = pd.concat([dataset[["text", "label"]].astype(str), earlier], ignore_index=True)
+    train = train[~train["text"].isin(held_out)]
+    new = added[~added["text"].isin(held_out)]
+
+    previous_version = registry.current_version()
+    previous = model.load_trained_model(registry.current_model_path())
+    candidate = model.warm_start_update(
+        previous, train, new, max_iter=args.max_iter, epochs=args.epochs
+    )
+
+    # Each model is judged at its own operating threshold.
+    before = model.evaluate_pipeline(
+        previous, holdout, threshold=registry.current_threshold()
+    ).metrics
+    evaluation = model.evaluate_pipeline(
+        candidate, holdout, objective=args.threshold_objective
+    )
+    after = evaluation.metrics
+    regressions = {
+        name: {"before": before[name], "after": after[name]}
+        for name in GATED_METRICS
+        if after[name] < before[name] - args.tolerance
+    }
+    promote = not regressions
+    version = registry.publish(
+        candidate,
+        after,
+        params={
+            "update_of": previous_version,
+            "added_rows": len(added),
+            "holdout_rows": len(holdout),
+            "threshold_objective": args.threshold_objective,
+        },
+        promote=promote,
+        threshold=evaluation.threshold,
+    )
+    if promote:
+        # Rejected rows stay out of the store so they cannot drag down later
+        # updates; they can be fixed and resubmitted.
+        data.append_labeled(added)
+        model_path = model.save_model(candidate)
+        model.save_operating_point(
+            evaluation.threshold, args.threshold_objective, model_path=model_path
+        )
+        if "tfidf" in candidate.named_steps:
+            compact.export_compact(candidate, source=Path(model_path))
+        model.save_metrics(after, evaluation.classification_report)
+
+    summary.update(
+        {
+            "model_version": version,
+            "previous_version": previous_version,
+            "promoted": promote,
+            "holdout_before": before,
+            "holdout_after": after,
+            "regressions": regressions,
+        }
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,23 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+import numpy as np
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from workflow_runner import latency_summary
 
 
 SAMPLE_PAYLOAD_PATH = Path(__file__).resolve().parent / "samples" / "sample_payload.json"
 DEFAULT_ENDPOINT = "http://localhost:5678/webhook/aiot-hw5-q2-ai-agent"
+MAX_CONCURRENCY = 256
 
 
 @st.cache_data(show_spinner=False)
@@ -38,9 +46,193 @@ def try_parse_payload(payload_text: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def request_webhook(url: str, payload: Dict[str, Any]) -> requests.Response:
-    headers = {"Content-Type": "application/json"}
-    return requests.post(url, headers=headers, json=payload, timeout=30)
+@st.cache_resource(show_spinner=False)
+def webhook_session() -> requests.Session:
+    """One keep-alive session shared by every request, run and browser session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Content-Type"] = "application/json"
+    return session
+
+
+def request_webhook(url: str, payload: Dict[str, Any], timeout: float = 30) -> requests.Response:
+    return webhook_session().post(url, json=payload, timeout=timeout)
+
+
+def parse_jsonl(text: str) -> List[Any]:
+    """Payloads from JSONL text; raises ValueError naming the first bad line."""
+    payloads = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            payloads.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"第 {number} 行不是合法 JSON：{exc}") from exc
+    return payloads
+
+
+class RateLimiter:
+    """Spaces request starts at least ``1 / rate_per_s`` apart across threads."""
+
+    def __init__(self, rate_per_s: float) -> None:
+        self.interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        time.sleep(slot - now)
+
+
+def _send_one(
+    url: str, payload: Any, timeout: float, limiter: RateLimiter
+) -> Dict[str, Any]:
+    limiter.wait()
+    started = time.perf_counter()
+    try:
+        response = request_webhook(url, payload, timeout=timeout)
+        status: Optional[int] = response.status_code
+        error = None if response.ok else f"HTTP {status}: {response.text[:200]}"
+    except requests.RequestException as exc:
+        status, error = None, f"{type(exc).__name__}: {exc}"
+    return {"status": status, "seconds": time.perf_counter() - started, "error": error}
+
+
+def run_batch(
+    url: str,
+    payloads: List[Any],
+    concurrency: int,
+    rate_per_s: float,
+    timeout: float,
+    on_progress: Callable[[List[Dict[str, Any]]], None],
+) -> Dict[str, Any]:
+    """POST every payload with ``concurrency`` workers and return a run summary.
+
+    Latency is measured from when a request is sent, after any rate-limit
+    wait. ``on_progress`` receives the results so far about every 0.25 s.
+    """
+    limiter = RateLimiter(rate_per_s)
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    last_update = 0.0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_send_one, url, p, timeout, limiter) for p in payloads]
+        for future in as_completed(futures):
+            results.append(future.result())
+            now = time.perf_counter()
+            if now - last_update >= 0.25 or len(results) == len(payloads):
+                on_progress(results)
+                last_update = now
+    wall = time.perf_counter() - started
+
+    errors = [result for result in results if result["error"]]
+    summary = latency_summary([r["seconds"] for r in results], len(errors), wall)
+    summary.update(concurrency=concurrency, rate_limit_per_s=rate_per_s or None)
+    statuses: Dict[str, int] = {}
+    for result in results:
+        key = str(result["status"] or "error")
+        statuses[key] = statuses.get(key, 0) + 1
+    summary["statuses"] = statuses
+    summary["latencies_ms"] = [round(1000.0 * r["seconds"], 2) for r in results]
+    summary["first_errors"] = [result["error"] for result in errors[:5]]
+    return summary
+
+
+def render_latency_histogram(latencies_ms: List[float], bins: int = 30) -> None:
+    counts, edges = np.histogram(latencies_ms, bins=bins)
+    st.bar_chart(
+        {"latency_ms": np.round(edges[:-1], 1).tolist(), "requests": counts.tolist()},
+        x="latency_ms",
+        y="requests",
+        x_label="latency bucket start (ms)",
+    )
+    st.caption(f"每格 {edges[1] - edges[0]:.1f} ms")
+
+
+def render_batch_mode(endpoint: str) -> None:
+    st.subheader("批次 / 壓力測試")
+    st.write(
+        "上傳 JSONL（每行一個 payload），以共用連線池、可調整的並行數與速率上限送到 "
+        "Webhook，即時顯示進度，結束後列出 p50 / p95 / p99 延遲與錯誤率，用來估算 "
+        "n8n 部署需要的容量。"
+    )
+    col_input, col_settings = st.columns([1.4, 1.6])
+    with col_input:
+        uploaded = st.file_uploader("Payload JSONL", type=["jsonl", "json", "txt"])
+        repeat = st.number_input(
+            "每筆 payload 重複次數（未上傳時使用 sample payload）",
+            min_value=1,
+            max_value=10_000,
+            value=1,
+        )
+    with col_settings:
+        concurrency = st.slider("並行數（同時進行的請求）", 1, MAX_CONCURRENCY, 8)
+        rate = st.number_input(
+            "速率上限（requests/s，0 = 不限）", min_value=0.0, value=0.0
+        )
+        timeout = st.number_input("逾時（秒）", min_value=1.0, value=60.0)
+
+    if not st.button("Run batch"):
+        return
+    if uploaded is not None:
+        try:
+            payloads = parse_jsonl(uploaded.getvalue().decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as exc:
+            st.error(str(exc))
+            return
+    else:
+        payloads = [load_sample_payload()]
+    payloads = payloads * int(repeat)
+    if not payloads:
+        st.warning("檔案中沒有任何 payload。")
+        return
+
+    progress = st.progress(0.0, text=f"0 / {len(payloads)}")
+    live = st.empty()
+
+    def on_progress(results: List[Dict[str, Any]]) -> None:
+        done = len(results)
+        errors = sum(1 for result in results if result["error"])
+        progress.progress(done / len(payloads), text=f"{done} / {len(payloads)}")
+        live.caption(
+            f"錯誤 {errors} 筆 · 目前 p50 "
+            f"{1000.0 * float(np.median([r['seconds'] for r in results])):.0f} ms"
+        )
+
+    summary = run_batch(
+        endpoint.strip(), payloads, int(concurrency), float(rate), float(timeout), on_progress
+    )
+    st.session_state.setdefault("batch_runs", []).append(
+        {key: value for key, value in summary.items() if key != "latencies_ms"}
+    )
+
+    cols = st.columns(6)
+    cols[0].metric("requests", summary["requests"])
+    cols[1].metric("error rate", f"{100.0 * summary['error_rate']:.1f}%")
+    cols[2].metric("throughput", f"{summary['throughput_per_s']} /s")
+    for col, q in zip(cols[3:], (50, 95, 99)):
+        col.metric(f"p{q}", f"{summary[f'p{q}_ms']} ms")
+    render_latency_histogram(summary["latencies_ms"])
+    st.write("HTTP status 分佈", summary["statuses"])
+    if summary["first_errors"]:
+        st.error("\n\n".join(summary["first_errors"]))
+
+    st.markdown("**本次瀏覽期間的所有批次**（比較不同並行數 / 速率設定）")
+    st.dataframe(
+        [
+            {key: value for key, value in run.items() if key not in ("statuses", "first_errors")}
+            for run in st.session_state["batch_runs"]
+        ],
+        use_container_width=True,
+    )
 
 
 def main() -> None:
@@ -105,6 +297,9 @@ def main() -> None:
                 except requests.RequestException as exc:
                     st.error(f"無法連線到 webhook：{exc}")
 
+    st.divider()
+    render_batch_mode(endpoint)
+
     st.divider()
     st.write(
         "📄 相關文件：`aiot_hw5/Q2/README.md`（部署、測試與 Demo 步驟）與 "
@@ -0,0 +1,196 @@
+"""Local stand-ins for the OpenAI and Notion endpoints used by workflow.json.
+
+Each stub is a threaded keep-alive HTTP server with a configurable response
+time, so ``workflow_runner.py`` (or n8n itself, by pointing the HTTP nodes at
+them) can be load-tested without API keys or rate limits:
+
+    python3 aiot_hw5/Q2/stub_servers.py --openai-port 8101 --notion-port 8102
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+OPENAI_ORIGIN = "https://api.openai.com"
+NOTION_ORIGIN = "https://api.notion.com"
+
+
+def _summary_content(user_message: str) -> Dict[str, Any]:
+    title = user_message.split("\n", 1)[0].replace("Title:", "").strip() or "Untitled"
+    return {
+        "summary": f"Stub summary of {title}.",
+        "translation": f"Stub translation of {title}.",
+        "action_items": ["Draft the script", "Confirm the guest"],
+        "hashtags": ["#podcast", "#stub"],
+        "key_points": ["Guest confirmed", "Script due soon"],
+        "tone": "warm",
+    }
+
+
+def _reply_content() -> Dict[str, Any]:
+    return {
+        "reply_text": "Thanks! We captured the next steps and will follow up.",
+        "subject_line": "Next steps captured",
+        "microcopy": "Your notes, already organized.",
+    }
+
+
+def chat_completion(request: Dict[str, Any]) -> Dict[str, Any]:
+    """A Chat Completions response shaped like OpenAI's, with JSON content.
+
+    The Compose Reply call is recognized by its system prompt asking for
+    ``reply_text``; every other call gets a summary.
+    """
+    messages: List[Dict[str, str]] = request.get("messages") or []
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+    content = _reply_content() if "reply_text" in system else _summary_content(user)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(content)},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def notion_page(request: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "object": "page",
+        "id": str(uuid.uuid4()),
+        "created_time": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        "parent": request.get("parent", {}),
+        "properties": request.get("properties", {}),
+    }
+
+
+ROUTES = {
+    "openai": {"/v1/chat/completions": chat_completion},
+    "notion": {"/v1/pages": notion_page},
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 with an explicit Content-Length keeps pooled client connections
+    # open; without TCP_NODELAY the body would wait on the client's delayed ACK
+    # of the headers (~40 ms per reused connection).
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    routes: Dict[str, Any] = {}
+    latency_seconds = 0.0
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        handler = self.routes.get(self.path.split("?", 1)[0])
+        if handler is None:
+            self._reply(404, {"error": f"no stub for {self.path}"})
+            return
+        try:
+            request = json.loads(raw or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "body is not JSON"})
+            return
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        self._reply(200, handler(request))
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def _serve(name: str, host: str, port: int, latency_ms: float) -> ThreadingHTTPServer:
+    handler = type(
+        f"{name.title()}StubHandler",
+        (_StubHandler,),
+        {"routes": ROUTES[name], "latency_seconds": latency_ms / 1000.0},
+    )
+    server = _StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name=f"{name}-stub", daemon=True).start()
+    return server
+
+
+@dataclass
+class StubServers:
+    servers: List[Tuple[str, ThreadingHTTPServer]]
+
+    @property
+    def url_map(self) -> Dict[str, str]:
+        """Origin rewrites for ``workflow_runner.RunContext``."""
+        origins = {"openai": OPENAI_ORIGIN, "notion": NOTION_ORIGIN}
+        return {
+            origins[name]: f"http://{server.server_address[0]}:{server.server_address[1]}"
+            for name, server in self.servers
+        }
+
+    def close(self) -> None:
+        for _, server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def start_stub_servers(
+    host: str = "127.0.0.1",
+    openai_port: int = 0,
+    notion_port: int = 0,
+    latency_ms: float = 50.0,
+) -> StubServers:
+    """Start both stubs in background threads (port 0 picks a free port)."""
+    return StubServers(
+        [
+            ("openai", _serve("openai", host, openai_port, latency_ms)),
+            ("notion", _serve("notion", host, notion_port, latency_ms)),
+        ]
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run local OpenAI and Notion stub servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--openai-port", type=int, default=8101)
+    parser.add_argument("--notion-port", type=int, default=8102)
+    parser.add_argument(
+        "--latency-ms", type=float, default=50.0, help="Simulated response time per request."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    servers = start_stub_servers(args.host, args.openai_port, args.notion_port, args.latency_ms)
+    print(json.dumps(servers.url_map, indent=2))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servers.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,709 @@
+"""Run the HW5 Q2 n8n workflow locally, without n8n.
+
+``Workflow`` loads ``workflow.json`` and walks the same node graph from a
+trigger node along its ``main`` connections. ``set``, ``httpRequest`` and
+``respondToWebhook`` nodes are interpreted from their parameters, including
+the small subset of n8n expressions the workflow uses (``$json[...]``,
+``$env.NAME`` and ``JSON.stringify(...)``). The JavaScript of each
+``function`` node is ported to Python in ``FUNCTION_NODES``; a warning is
+raised when a node's code no longer matches the version that was ported.
+
+Many payloads run concurrently on one asyncio loop. HTTP nodes share a
+``PooledHTTPClient``: a keep-alive ``requests`` connection pool driven
+from worker threads, with a semaphore per host so a slow API cannot take
+every connection.
+
+    python3 aiot_hw5/Q2/workflow_runner.py --stub --repeat 200 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_DIR = Path(__file__).resolve().parent
+WORKFLOW_PATH = BASE_DIR / "workflow.json"
+SAMPLE_PAYLOAD_PATH = BASE_DIR / "samples" / "sample_payload.json"
+WEBHOOK_NODE = "AIOT HW5 Q2 Webhook"
+
+Item = Dict[str, Any]
+
+
+class WorkflowError(RuntimeError):
+    """Raised when a node fails; carries the node name like n8n's execution log."""
+
+    def __init__(self, node: str, message: str) -> None:
+        super().__init__(f"{node}: {message}")
+        self.node = node
+
+
+def _get(mapping: Mapping[str, Any], key: str, default: Any = None) -> Any:
+    # JavaScript's ``mapping.key ?? default``: only a missing or null value falls back.
+    value = mapping.get(key) if isinstance(mapping, Mapping) else None
+    return default if value is None else value
+
+
+def _iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# --------------------------------------------------------------------------
+# Function nodes (Python ports of the JavaScript in workflow.json)
+# --------------------------------------------------------------------------
+
+
+def prepare_input(items: List[Item], context: "RunContext") -> List[Item]:
+    results = []
+    for item in items:
+        payload = _get(item, "body", item)
+        text = str(_get(payload, "content", _get(payload, "text", ""))).strip()
+        if not text:
+            raise ValueError("Payload must include a non-empty `content` field.")
+        language = str(_get(payload, "language", "zh")).lower()
+        target_language = _get(payload, "target_language", "en" if language == "zh" else "zh")
+        results.append(
+            {
+                "title": _get(payload, "title", "Untitled request"),
+                "content": text,
+                "language": language,
+                "target_language": target_language,
+                "tone": _get(payload, "tone", "專業且親切"),
+                "notify_channel": _get(payload, "notify_channel", "webhook"),
+                "email": _get(payload, "email", ""),
+                "source": _get(payload, "source", "webhook"),
+                "created_at": _iso_now(),
+                "tags": _get(payload, "tags", []),
+                "metadata": _get(payload, "metadata", {}),
+            }
+        )
+    return results
+
+
+def _parse_llm_json(response: Any, what: str) -> Dict[str, Any]:
+    try:
+        content = _get(response["choices"][0]["message"], "content", "{}")
+    except (KeyError, IndexError, TypeError):
+        content = "{}"
+    try:
+        return json.loads(content)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Unable to parse {what} JSON from OpenAI: {exc}") from exc
+
+
+def parse_summary(items: List[Item], context: "RunContext") -> List[Item]:
+    results = []
+    for item in items:
+        payload = dict(item)
+        parsed = _parse_llm_json(_get(payload, "llm_summary", {}), "summary")
+        payload.pop("llm_summary", None)
+        payload.update(
+            summary=_get(parsed, "summary", ""),
+            translation=_get(parsed, "translation", ""),
+            action_items=_get(parsed, "action_items", []),
+            hashtags=_get(parsed, "hashtags", []),
+            key_points=_get(parsed, "key_points", []),
+            tone_suggestion=_get(parsed, "tone", payload.get("tone")),
+        )
+        results.append(payload)
+    return results
+
+
+def extract_reply(items: List[Item], context: "RunContext") -> List[Item]:
+    results = []
+    for item in items:
+        payload = dict(item)
+        parsed = _parse_llm_json(_get(payload, "llm_reply", {}), "reply")
+        payload.pop("llm_reply", None)
+        payload.update(
+            reply_text=_get(parsed, "reply_text", ""),
+            subject_line=_get(parsed, "subject_line", ""),
+            microcopy=_get(parsed, "microcopy", ""),
+        )
+        results.append(payload)
+    return results
+
+
+def _heading(text: str) -> Dict[str, Any]:
+    return {
+        "object": "block",
+        "type": "heading_2",
+        "heading_2": {"rich_text": [{"type": "text", "text": {"content": text}}]},
+    }
+
+
+def _paragraph(text: str) -> Dict[str, Any]:
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]},
+    }
+
+
+def build_notion_payload(items: List[Item], context: "RunContext") -> List[Item]:
+    results = []
+    for item in items:
+        hashtags = [tag.replace("#", "", 1).strip() for tag in _get(item, "hashtags", [])]
+        hashtags = [tag for tag in hashtags if tag]
+        database_id = context.env.get("NOTION_DATABASE_ID") or "YOUR_NOTION_DATABASE_ID"
+        blocks = [
+            _heading("AI Summary"),
+            _paragraph(item.get("summary") or "N/A"),
+            _heading("Action Items"),
+        ]
+        for action in _get(item, "action_items", []):
+            blocks.append(
+                {
+                    "object": "block",
+                    "type": "to_do",
+                    "to_do": {
+                        "rich_text": [{"type": "text", "text": {"content": action}}],
+                        "checked": False,
+                    },
+                }
+            )
+        blocks.append(_heading("English Translation"))
+        blocks.append(_paragraph(item.get("translation") or "N/A"))
+        notion_payload = {
+            "parent": {"database_id": database_id},
+            "properties": {
+                "Name": {
+                    "title": [
+                        {"text": {"content": f"{item['title']} ({context.local_time(item)})"}}
+                    ]
+                },
+                "Source": {"rich_text": [{"text": {"content": item.get("source")}}]},
+                "Tags": {"multi_select": [{"name": name} for name in hashtags]},
+            },
+            "children": blocks,
+        }
+        results.append({**item, "notion_payload": notion_payload})
+    return results
+
+
+def assemble_response(items: List[Item], context: "RunContext") -> List[Item]:
+    return [
+        {
+            "title": item.get("title"),
+            "summary": item.get("summary"),
+            "translation": item.get("translation"),
+            "action_items": item.get("action_items"),
+            "hashtags": item.get("hashtags"),
+            "ai_reply": item.get("reply_text"),
+            "subject_line": item.get("subject_line"),
+            "microcopy": item.get("microcopy"),
+            "notion_page_id": _get(item.get("notion_result") or {}, "id"),
+            "created_at": item.get("created_at"),
+            "source": item.get("source"),
+        }
+        for item in items
+    ]
+
+
+FunctionNode = Callable[[List[Item], "RunContext"], List[Item]]
+
+# Node name -> (Python port, sha256 prefix of the JavaScript it was ported from).
+FUNCTION_NODES: Dict[str, Tuple[FunctionNode, str]] = {
+    "Prepare Input": (prepare_input, "499969f22c3b"),
+    "Parse Summary": (parse_summary, "e1753576c0b3"),
+    "Extract Reply": (extract_reply, "825c116ac80e"),
+    "Build Notion Payload": (build_notion_payload, "31fd46f112a8"),
+    "Assemble Response": (assemble_response, "d402cee20aa3"),
+}
+
+
+def code_digest(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()[:12]
+
+
+# --------------------------------------------------------------------------
+# Expressions
+# --------------------------------------------------------------------------
+
+_TEMPLATE = re.compile(r"\{\{\s*(.*?)\s*\}\}", re.S)
+_JSON_FIELD = re.compile(r"""^\$json(?:\[\s*["']([^"']+)["']\s*\]|\.(\w+))?$""")
+_ENV_FIELD = re.compile(r"""^\$env(?:\.(\w+)|\[\s*["']([^"']+)["']\s*\])$""")
+_STRINGIFY = re.compile(r"^JSON\.stringify\((.*)\)$", re.S)
+
+
+def evaluate(expression: str, item: Item, env: Mapping[str, str]) -> Any:
+    """Evaluate one ``{{ ... }}`` expression of the subset this workflow uses."""
+    expression = expression.strip()
+    match = _JSON_FIELD.match(expression)
+    if match:
+        key = match.group(1) or match.group(2)
+        return item if key is None else item.get(key)
+    match = _ENV_FIELD.match(expression)
+    if match:
+        return env.get(match.group(1) or match.group(2), "")
+    match = _STRINGIFY.match(expression)
+    if match:
+        return json.dumps(evaluate(match.group(1), item, env), ensure_ascii=False)
+    raise ValueError(f"Unsupported n8n expression: {{{{{expression}}}}}")
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _render(value: Any, item: Item, env: Mapping[str, str]) -> Any:
+    if isinstance(value, str):
+        return _TEMPLATE.sub(lambda m: _to_text(evaluate(m.group(1), item, env)), value)
+    if isinstance(value, list):
+        return [_render(entry, item, env) for entry in value]
+    if isinstance(value, dict):
+        return {key: _render(entry, item, env) for key, entry in value.items()}
+    return value
+
+
+def resolve_parameter(value: Any, item: Item, env: Mapping[str, str]) -> Any:
+    """Resolve a node parameter; ``=``-prefixed strings are n8n expressions.
+
+    A parameter that is a single ``{{ ... }}`` returns the expression's value.
+    Otherwise the template is parsed as JSON first and expressions are
+    substituted inside its strings, so substituted text is always escaped.
+    """
+    if not isinstance(value, str) or not value.startswith("="):
+        return value
+    template = value[1:]
+    whole = _TEMPLATE.fullmatch(template.strip())
+    if whole:
+        return evaluate(whole.group(1), item, env)
+    try:
+        parsed = json.loads(template)
+    except ValueError:
+        return _render(template, item, env)
+    return _render(parsed, item, env)
+
+
+def _as_json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+# --------------------------------------------------------------------------
+# HTTP
+# --------------------------------------------------------------------------
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class HTTPResult:
+    status: int
+    body: Any
+    seconds: float
+
+
+class PooledHTTPClient:
+    """Concurrent HTTP for asyncio code over one pooled ``requests`` session.
+
+    Requests run on a thread pool sized for ``per_host_limit`` connections to
+    ``max_hosts`` hosts. Each host has its own semaphore and keep-alive pool of
+    ``per_host_limit`` connections, so at most that many requests to one host
+    are in flight and connections are reused between them.
+    """
+
+    def __init__(
+        self, per_host_limit: int = 8, timeout: float = 30.0, max_hosts: int = 4
+    ) -> None:
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be a positive integer.")
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=per_host_limit)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=per_host_limit * max_hosts, thread_name_prefix="http"
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.calls: Dict[str, int] = {}
+
+    def _send(
+        self, method: str, url: str, body: Any, headers: Dict[str, str]
+    ) -> HTTPResult:
+        started = time.perf_counter()
+        response = self._session.request(
+            method, url, json=body, headers=headers, timeout=self.timeout
+        )
+        try:
+            payload: Any = response.json()
+        except ValueError:
+            payload = response.text
+        return HTTPResult(response.status_code, payload, time.perf_counter() - started)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> HTTPResult:
+        host = _host_key(url)
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with limit:
+            self.calls[host] = self.calls.get(host, 0) + 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._send, method, url, body, dict(headers or {})
+            )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self) -> "PooledHTTPClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# --------------------------------------------------------------------------
+# Workflow
+# --------------------------------------------------------------------------
+
+
+@dataclass
+class RunContext:
+    client: PooledHTTPClient
+    env: Mapping[str, str]
+    url_map: Mapping[str, str]
+    timezone_name: str = "UTC"
+
+    def rewrite(self, url: str) -> str:
+        for origin, target in self.url_map.items():
+            if url.startswith(origin):
+                return target.rstrip("/") + url[len(origin) :]
+        return url
+
+    def local_time(self, item: Item) -> str:
+        # ``new Date(created_at).toLocaleString('sv')`` in the workflow's timezone.
+        created = datetime.fromisoformat(str(item["created_at"]).replace("Z", "+00:00"))
+        return created.astimezone(ZoneInfo(self.timezone_name)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class Execution:
+    """Outcome of one payload: the webhook response or the error that stopped it."""
+
+    payload: Any
+    response: Any = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    node_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Workflow:
+    """The node graph of an n8n workflow export."""
+
+    def __init__(self, definition: Dict[str, Any]) -> None:
+        self.name = definition.get("name", "")
+        self.nodes = {node["name"]: node for node in definition["nodes"]}
+        self.connections = definition.get("connections", {})
+        self.timezone = definition.get("settings", {}).get("timezone", "UTC")
+        for name, node in self.nodes.items():
+            if node["type"] != "n8n-nodes-base.function":
+                continue
+            if name not in FUNCTION_NODES:
+                raise ValueError(f"Function node {name!r} has no Python port in FUNCTION_NODES.")
+            digest = code_digest(node["parameters"].get("functionCode", ""))
+            if digest != FUNCTION_NODES[name][1]:
+                warnings.warn(
+                    f"{name}: functionCode changed (sha256 {digest}); "
+                    "check that its Python port still matches.",
+                    stacklevel=2,
+                )
+
+    @classmethod
+    def load(cls, path: Path = WORKFLOW_PATH) -> "Workflow":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def successors(self, name: str) -> List[str]:
+        outputs = self.connections.get(name, {}).get("main", [])
+        return [target["node"] for output in outputs for target in output or []]
+
+    async def run(
+        self, payload: Any, context: RunContext, trigger: str = WEBHOOK_NODE
+    ) -> Execution:
+        """Execute one payload from ``trigger`` and return the webhook response."""
+        execution = Execution(payload=payload)
+        started = time.perf_counter()
+        pending: List[Tuple[str, List[Item]]] = [(trigger, [])]
+        responded: Optional[List[Item]] = None
+        items: List[Item] = []
+        try:
+            while pending:
+                name, items = pending.pop(0)
+                node_started = time.perf_counter()
+                items = await self._execute(self.nodes[name], items, payload, context)
+                execution.node_seconds[name] = time.perf_counter() - node_started
+                if self.nodes[name]["type"] == "n8n-nodes-base.respondToWebhook":
+                    responded = items
+                pending.extend((target, items) for target in self.successors(name))
+            # Without a Respond to Webhook node n8n answers with the last node's output.
+            output = items if responded is None else responded
+            execution.response = output[0] if len(output) == 1 else output
+        except WorkflowError as exc:
+            execution.error = str(exc)
+        execution.seconds = time.perf_counter() - started
+        return execution
+
+    async def _execute(
+        self, node: Dict[str, Any], items: List[Item], payload: Any, context: RunContext
+    ) -> List[Item]:
+        name, kind = node["name"], node["type"].rsplit(".", 1)[-1]
+        parameters = node.get("parameters", {})
+        try:
+            if kind == "webhook":
+                return [{"body": payload, "headers": {}, "query": {}}]
+            if kind == "manualTrigger":
+                return [{}]
+            if kind == "set":
+                values = {
+                    entry["name"]: entry.get("value")
+                    for entries in parameters.get("values", {}).values()
+                    for entry in entries
+                }
+                if parameters.get("keepOnlySet"):
+                    return [dict(values) for _ in items or [{}]]
+                return [{**item, **values} for item in items or [{}]]
+            if kind == "function":
+                return FUNCTION_NODES[name][0](items, context)
+            if kind == "httpRequest":
+                return list(
+                    await asyncio.gather(
+                        *(self._http(parameters, item, context) for item in items)
+                    )
+                )
+            if kind == "respondToWebhook":
+                return [
+                    resolve_parameter(parameters.get("responseBody", "={{$json}}"), item, {})
+                    for item in items
+                ]
+        except WorkflowError:
+            raise
+        except Exception as exc:  # Any node failure stops this execution only.
+            raise WorkflowError(name, f"{type(exc).__name__}: {exc}") from exc
+        raise WorkflowError(name, f"unsupported node type {node['type']}")
+
+    async def _http(self, parameters: Dict[str, Any], item: Item, context: RunContext) -> Item:
+        options = parameters.get("options", {})
+        env = context.env
+        url = context.rewrite(str(resolve_parameter(parameters["url"], item, env)))
+        header_json = parameters.get("headerParametersJson", "{}")
+        headers = _as_json(resolve_parameter(header_json, item, env))
+        body = None
+        if parameters.get("sendBody", True):
+            body_json = parameters.get("bodyParametersJson", "{}")
+            body = _as_json(resolve_parameter(body_json, item, env))
+        method = parameters.get("method", "GET")
+        result = await context.client.request(method, url, body, headers)
+        if result.status >= 400 and not options.get("ignoreResponseCode"):
+            raise RuntimeError(f"HTTP {result.status} from {url}: {str(result.body)[:200]}")
+        # The workflow's function nodes expect the response merged into the
+        # item under ``responsePropertyName`` rather than replacing it.
+        return {**item, options.get("responsePropertyName", "data"): result.body}
+
+
+async def run_many(
+    workflow: Workflow,
+    payloads: List[Any],
+    context: RunContext,
+    concurrency: int = 16,
+    trigger: str = WEBHOOK_NODE,
+    on_done: Optional[Callable[[int, Execution], None]] = None,
+) -> List[Execution]:
+    """Run every payload with at most ``concurrency`` executions in flight."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be a positive integer.")
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, payload: Any) -> Execution:
+        async with limit:
+            execution = await workflow.run(payload, context, trigger=trigger)
+        if on_done is not None:
+            on_done(index, execution)
+        return execution
+
+    return list(await asyncio.gather(*(one(i, p) for i, p in enumerate(payloads))))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (``q`` in 0..100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies: List[float], errors: int, wall_seconds: float) -> Dict[str, Any]:
+    """Counts, error rate, throughput and p50/p95/p99 latency (ms) of a run."""
+    total = len(latencies)
+    summary: Dict[str, Any] = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_s": round(total / wall_seconds, 2) if wall_seconds > 0 else None,
+    }
+    for q in (50, 95, 99):
+        summary[f"p{q}_ms"] = round(1000.0 * percentile(latencies, q), 2) if total else None
+    summary["max_ms"] = round(1000.0 * max(latencies), 2) if total else None
+    return summary
+
+
+# --------------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------------
+
+
+def read_payloads(path: Optional[Path]) -> List[Any]:
+    """Payloads from a JSONL file (one per line) or a single JSON file."""
+    path = Path(path or SAMPLE_PAYLOAD_PATH)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [json.loads(text)]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Execute workflow.json locally for many payloads concurrently"
+    )
+    parser.add_argument(
+        "--workflow", type=Path, default=WORKFLOW_PATH, help="n8n workflow export."
+    )
+    parser.add_argument(
+        "--input",
+        type=Path,
+        help="JSONL file of webhook payloads (default: samples/sample_payload.json).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Send every payload this many times."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Workflow executions in flight."
+    )
+    parser.add_argument(
+        "--per-host-limit",
+        type=int,
+        default=8,
+        help="Concurrent requests (and pooled connections) per API host.",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds.")
+    parser.add_argument(
+        "--trigger",
+        default=WEBHOOK_NODE,
+        help="Node to start from ('Manual Trigger' runs the Sample Payload node).",
+    )
+    parser.add_argument(
+        "--rewrite",
+        action="append",
+        default=[],
+        metavar="ORIGIN=URL",
+        help="Send requests for ORIGIN (e.g. https://api.openai.com) to URL instead.",
+    )
+    parser.add_argument(
+        "--stub",
+        action="store_true",
+        help="Start local OpenAI and Notion stub servers and route both APIs to them.",
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=50.0,
+        help="Simulated response time of the stub servers.",
+    )
+    parser.add_argument("--output", type=Path, help="Write one JSON result per payload here.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    workflow = Workflow.load(args.workflow)
+    payloads = read_payloads(args.input) * max(args.repeat, 1)
+    url_map = dict(entry.split("=", 1) for entry in args.rewrite)
+
+    servers = None
+    if args.stub:
+        from stub_servers import start_stub_servers
+
+        servers = start_stub_servers(latency_ms=args.stub_latency_ms)
+        url_map = {**servers.url_map, **url_map}
+
+    try:
+        with PooledHTTPClient(per_host_limit=args.per_host_limit, timeout=args.timeout) as client:
+            context = RunContext(
+                client=client, env=os.environ, url_map=url_map, timezone_name=workflow.timezone
+            )
+            started = time.perf_counter()
+            executions = asyncio.run(
+                run_many(workflow, payloads, context, args.concurrency, trigger=args.trigger)
+            )
+            wall = time.perf_counter() - started
+    finally:
+        if servers is not None:
+            servers.close()
+
+    if args.output:
+        with args.output.open("w", encoding="utf-8") as handle:
+            for execution in executions:
+                record = {"ok": execution.ok, "seconds": round(execution.seconds, 4)}
+                record.update(response=execution.response, error=execution.error)
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    errors = [execution.error for execution in executions if not execution.ok]
+    node_names = list(dict.fromkeys(n for e in executions for n in e.node_seconds))
+    summary = latency_summary([e.seconds for e in executions], len(errors), wall)
+    summary["node_mean_ms"] = {
+        name: round(
+            1000.0
+            * sum(e.node_seconds.get(name, 0.0) for e in executions)
+            / max(sum(name in e.node_seconds for e in executions), 1),
+            2,
+        )
+        for name in node_names
+    }
+    summary["http_calls"] = client.calls
+    summary["first_errors"] = errors[:3]
+    if len(executions) == 1 and executions[0].ok:
+        summary["response"] = executions[0].response
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()